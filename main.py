@@ -9,16 +9,24 @@ Author: @gaelhuot
 Version: 1.0.0
 """
 
+import importlib.util
 import json
 import logging
+import logging.handlers
 import os
+import queue
 import sqlite3
 import sys
+import threading
 import time
 from contextlib import contextmanager
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from functools import lru_cache
+from itertools import islice
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Iterator, List, Optional, Dict, Any
+from uuid import UUID
+from typing import TYPE_CHECKING, Iterable, Iterator, List, Optional, Dict, Any, Tuple, Union
 
 import argparse
 from dotenv import load_dotenv
@@ -26,37 +34,109 @@ from dotenv import load_dotenv
 from esdbclient import EventStoreDBClient
 from esdbclient.events import RecordedEvent
 
+try:
+    import orjson
+except ImportError:  # Optional speedup, fall back to the stdlib encoder
+    orjson = None
+
+# Optional, only needed for --format parquet. Importing it takes about a
+# quarter of this module's import time, so it is deferred to _pyarrow()
+PYARROW_AVAILABLE = importlib.util.find_spec("pyarrow") is not None
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
 # Load environment variables
 load_dotenv()
 
 # Constants
-DEFAULT_BATCH_SIZE = 1000
+DEFAULT_COMMIT_FREQUENCY = 0  # 0 = single transaction for the whole import
 DEFAULT_DB_PATH = "eventstore.db"
 DEFAULT_LOG_LEVEL = "INFO"
-
-# Configure logging
+OUTPUT_FORMATS = ("sqlite", "parquet")
+READ_AHEAD_BATCHES = 4  # Batches buffered between the reader and the writer
+MAX_DATA_SIZE = 1024 * 1024  # 1MB limit for event data
+
+EVENT_COLUMNS = (
+    "id",
+    "recorded_at",
+    "event_type",
+    "stream_name",
+    "data",
+    "eventstore_metadata",
+    "processed_at",
+)
+# Event ids are only unique per stream, so $all can repeat one, and resumed
+# imports read events that are already stored. The first copy of an id is kept
+# (events are immutable, there is nothing to update); unlike OR IGNORE, the
+# conflict clause only covers the id, so CHECK violations still fail.
+INSERT_EVENTS_SQL = f"INSERT INTO events ({', '.join(EVENT_COLUMNS)}) VALUES "
+INSERT_EVENTS_CONFLICT_SQL = " ON CONFLICT(id) DO NOTHING"
+INSERT_ROW_PLACEHOLDER = f"({', '.join('?' * len(EVENT_COLUMNS))})"
+
+# Default host parameter limit of SQLite >= 3.32, used when the limit of the
+# linked library cannot be queried (Python < 3.11)
+SQLITE_MAX_VARIABLE_NUMBER = 32766
+# Largest batch that fits a single multi-row INSERT under that limit (4680),
+# so a default batch never leaves a short, uncached tail statement
+DEFAULT_BATCH_SIZE = SQLITE_MAX_VARIABLE_NUMBER // len(EVENT_COLUMNS)
+
+LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+LOG_FILE = "eventstore_converter.log"
+
+# Configure console logging; the log file is only added by main(), so
+# importing the module (e.g. from tests) does not create it
 logging.basicConfig(
     level=getattr(logging, os.getenv("LOG_LEVEL", DEFAULT_LOG_LEVEL).upper()),
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.StreamHandler(sys.stdout),
-        logging.FileHandler("eventstore_converter.log"),
-    ],
+    format=LOG_FORMAT,
+    handlers=[logging.StreamHandler(sys.stdout)],
 )
 
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+def _add_file_logging(path: str = LOG_FILE) -> None:
+    """Also log to a file, buffered and flushed every 1024 records or on errors."""
+    file_handler = logging.FileHandler(path)
+    file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    logging.getLogger().addHandler(
+        logging.handlers.MemoryHandler(
+            1024, flushLevel=logging.ERROR, target=file_handler
+        )
+    )
+
+
+if orjson is not None:
+
+    def _json_dumps(obj: Any) -> str:
+        """Serialize to a JSON string with orjson."""
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+
+else:
+    _json_dumps = json.dumps
+
+
+@dataclass(frozen=True, slots=True)
 class ConversionConfig:
-    """Configuration for the EventStore to SQLite conversion process."""
+    """
+    Configuration for the EventStore to SQLite conversion process.
+
+    Frozen, so one instance can be shared safely; use dataclasses.replace()
+    to derive a variant (validation runs again on the copy).
+    """
 
     eventstore_uri: str
     db_path: Path
     batch_size: int = DEFAULT_BATCH_SIZE
-    commit_frequency: int = 5  # Commit every N batches
+    commit_frequency: int = DEFAULT_COMMIT_FREQUENCY  # Commit every N batches
     validate_data: bool = True
     create_indexes: bool = True
+    unsafe_fast_import: bool = False  # No journal/fsync during import
+    force: bool = False  # Clear existing events before importing
+    strict_connect: bool = False  # Check the EventStore connection up front
+    output_format: str = "sqlite"  # One of OUTPUT_FORMATS
+    max_rows_per_stmt: int = field(init=False)  # Rows per multi-row INSERT
 
     def __post_init__(self) -> None:
         """Validate configuration after initialization."""
@@ -66,8 +146,22 @@ class ConversionConfig:
         if self.batch_size <= 0:
             raise ValueError("Batch size must be positive")
 
-        if self.commit_frequency <= 0:
-            raise ValueError("Commit frequency must be positive")
+        if self.commit_frequency < 0:
+            raise ValueError("Commit frequency must not be negative")
+
+        if self.output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"Unsupported output format: {self.output_format}")
+
+        if self.output_format == "parquet" and not PYARROW_AVAILABLE:
+            raise ValueError("Parquet output requires pyarrow to be installed")
+
+        # Multi-row INSERTs bind one parameter per column and row
+        object.__setattr__(
+            self,
+            "max_rows_per_stmt",
+            min(self.batch_size, _sqlite_variable_limit() // len(EVENT_COLUMNS)),
+        )
+        logger.debug(f"Inserting at most {self.max_rows_per_stmt} rows per statement")
 
         # Ensure parent directory exists
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
@@ -75,120 +169,190 @@ class ConversionConfig:
         logger.info(f"Configuration validated: {self}")
 
 
+@lru_cache(maxsize=None)
+def _sqlite_variable_limit() -> int:
+    """Get the host parameter limit of the linked SQLite library (looked up once)."""
+    connection = sqlite3.connect(":memory:")
+    try:
+        return connection.getlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER)
+    except AttributeError:
+        return SQLITE_MAX_VARIABLE_NUMBER
+    finally:
+        connection.close()
+
+
 class EventValidationError(Exception):
     """Raised when event data validation fails."""
 
     pass
 
 
-class SQLiteEvent:
+# Row layout of the events table, processed_at is appended per batch on insert:
+# (id, recorded_at, event_type, stream_name, data, eventstore_metadata)
+EventRow = Tuple[Union[bytes, str], int, str, str, Optional[Union[str, bytes]], str]
+
+
+def event_to_row(event: RecordedEvent, validate: bool = True) -> EventRow:
     """
-    EventStore event adapted for SQLite storage with validation.
+    Convert an EventStore event into an events table row with validation.
+
+    The row is built directly as a tuple so it can be handed to the insert
+    statement without an intermediate object per event.
+
+    Args:
+        event: The original EventStore event
+        validate: Whether to validate event data
+
+    Returns:
+        Tuple matching the events table columns
 
-    This class transforms EventStore events into a SQLite-compatible format
-    with comprehensive validation and error handling.
+    Raises:
+        EventValidationError: If validation fails
     """
+    event_id = event.id
+    return (
+        # 16 raw bytes make a smaller primary key than the 36 char text form
+        event_id.bytes if isinstance(event_id, UUID) else str(event_id),
+        _to_epoch_seconds(event.recorded_at),
+        event.type or "unknown",
+        event.stream_name or "unknown",
+        _process_event_data(event.data, validate, event_id),
+        _serialize_metadata(event),
+    )
 
-    MAX_DATA_SIZE = 1024 * 1024  # 1MB limit for event data
 
-    def __init__(self, event: RecordedEvent, validate: bool = True) -> None:
-        """
-        Initialize SQLite event from EventStore event.
+_EPOCH_UTC = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_ONE_SECOND = timedelta(seconds=1)
 
-        Args:
-            event: The original EventStore event
-            validate: Whether to validate event data
 
-        Raises:
-            EventValidationError: If validation fails
-        """
-        self.id = str(event.id)
-        self.type = event.type or "unknown"
-        self.stream_name = event.stream_name or "unknown"
-        self.recorded_at = int(event.recorded_at.timestamp())
+def _to_epoch_seconds(value: datetime) -> int:
+    """
+    Convert a datetime to Unix seconds.
 
-        # Validate and process event data
-        self.data = self._process_event_data(event.data, validate)
+    Timezone-aware values (EventStoreDB returns UTC) are converted with plain
+    datetime arithmetic, skipping the local time handling of timestamp().
+    Naive values keep the timestamp() semantics (local time).
+    """
+    if getattr(value, "tzinfo", None) is not None:
+        return (value - _EPOCH_UTC) // _ONE_SECOND
+    return int(value.timestamp())
 
-        # Convert EventStore metadata to JSON
-        self.eventstore_metadata = self._serialize_metadata(event)
 
-    def _process_event_data(self, data: Any, validate: bool) -> Optional[str]:
-        """
-        Process and validate event data.
+def _process_event_data(
+    data: Any, validate: bool, event_id: Any
+) -> Optional[Union[str, bytes]]:
+    """
+    Process and validate event data.
 
-        Args:
-            data: Raw event data
-            validate: Whether to perform validation
+    Without validation, bytes payloads are passed through untouched and stored
+    as BLOBs, which saves decoding every event body into a new string.
 
-        Returns:
-            Processed data as string or None
+    Args:
+        data: Raw event data
+        validate: Whether to perform validation
+        event_id: Event identifier, used in log messages
 
-        Raises:
-            EventValidationError: If validation fails
-        """
-        if data is None:
-            return None
+    Returns:
+        Processed data as string, raw bytes or None
 
-        # Convert bytes to string if needed
-        if isinstance(data, bytes):
-            try:
-                data_str = data.decode("utf-8")
-            except UnicodeDecodeError as e:
-                if validate:
-                    raise EventValidationError(f"Invalid UTF-8 data: {e}")
-                logger.warning(f"Skipping invalid UTF-8 data for event {self.id}")
-                return None
-        elif isinstance(data, str):
-            data_str = data
-        else:
-            # Convert other types to JSON string
-            try:
-                data_str = json.dumps(data)
-            except (TypeError, ValueError) as e:
-                if validate:
-                    raise EventValidationError(f"Cannot serialize data: {e}")
-                logger.warning(f"Skipping non-serializable data for event {self.id}")
-                return None
-
-        # Validate data size
-        if validate and len(data_str.encode("utf-8")) > self.MAX_DATA_SIZE:
+    Raises:
+        EventValidationError: If validation fails
+    """
+    if data is None:
+        return None
+
+    # Convert bytes to string if needed
+    if isinstance(data, bytes):
+        if not validate:
+            return data
+
+        # The byte length is known up front: reject oversized payloads
+        # before paying for the decode
+        if len(data) > MAX_DATA_SIZE:
             raise EventValidationError(
-                f"Event data too large: {len(data_str)} bytes > {self.MAX_DATA_SIZE}"
+                f"Event data too large: {len(data)} bytes > {MAX_DATA_SIZE}"
             )
+        try:
+            return data.decode("utf-8")
+        except UnicodeDecodeError as e:
+            raise EventValidationError(f"Invalid UTF-8 data: {e}")
+    elif isinstance(data, str):
+        data_str = data
+    else:
+        # Convert other types to JSON string
+        try:
+            data_str = _json_dumps(data)
+        except (TypeError, ValueError) as e:
+            if validate:
+                raise EventValidationError(f"Cannot serialize data: {e}")
+            logger.warning(f"Skipping non-serializable data for event {event_id}")
+            return None
 
-        return data_str
+    # Validate data size
+    if validate:
+        _check_data_size(data_str)
 
-    def _serialize_metadata(self, event: RecordedEvent) -> str:
-        """
-        Serialize EventStore metadata to JSON.
+    return data_str
 
-        Args:
-            event: The original EventStore event
 
-        Returns:
-            JSON string of metadata
-        """
-        metadata = {
-            "stream_position": getattr(event, "stream_position", None),
-            "commit_position": getattr(event, "commit_position", None),
-            "prepare_position": getattr(event, "prepare_position", None),
-            "retry_count": getattr(event, "retry_count", 0),
-            "link": getattr(event, "link", None),
-            "content_type": getattr(event, "content_type", None),
-            "created": getattr(event, "created", None),
-        }
+def _check_data_size(data_str: str) -> None:
+    """
+    Check the UTF-8 size of event data without encoding it when possible.
+
+    A character takes between 1 and 4 bytes, so the character count bounds the
+    encoded size on both sides; the string is only encoded near the limit.
+
+    Raises:
+        EventValidationError: If the data exceeds MAX_DATA_SIZE
+    """
+    size = len(data_str)
+    if size * 4 <= MAX_DATA_SIZE:
+        return
+    if size <= MAX_DATA_SIZE:
+        size = len(data_str.encode("utf-8"))
+        if size <= MAX_DATA_SIZE:
+            return
+    raise EventValidationError(
+        f"Event data too large: {size} bytes > {MAX_DATA_SIZE}"
+    )
 
-        # Remove None values and convert timestamps
-        cleaned_metadata = {}
-        for key, value in metadata.items():
-            if value is not None:
-                if hasattr(value, "timestamp"):  # Handle datetime objects
-                    cleaned_metadata[key] = int(value.timestamp())
-                else:
-                    cleaned_metadata[key] = value
 
-        return json.dumps(cleaned_metadata)
+# EventStore attributes copied into the eventstore_metadata column
+_META_KEYS = (
+    "stream_position",
+    "commit_position",
+    "prepare_position",
+    "retry_count",
+    "link",
+    "content_type",
+    "created",
+)
+
+
+def _serialize_metadata(event: RecordedEvent) -> str:
+    """
+    Serialize EventStore metadata to JSON.
+
+    Reads the instance __dict__ directly rather than going through getattr,
+    skipping None values and converting timestamps in a single pass.
+
+    Args:
+        event: The original EventStore event
+
+    Returns:
+        JSON string of metadata
+    """
+    attributes = event.__dict__
+    metadata = {}
+    for key in _META_KEYS:
+        value = attributes.get(key)
+        if value is None:
+            continue
+        if hasattr(value, "timestamp"):  # Handle datetime objects
+            value = _to_epoch_seconds(value)
+        metadata[key] = value
+
+    return _json_dumps(metadata)
 
 
 class SQLiteEventStore:
@@ -210,8 +374,15 @@ class SQLiteEventStore:
         self.db_path = db_path
         self.config = config
         self.connection: Optional[sqlite3.Connection] = None
+        self._insert_cursor: Optional[sqlite3.Cursor] = None
+        self._insert_sql_cache: Dict[int, str] = {}
+        self._fresh_import = False
+        self._text_ids = False  # Events table written by a version storing TEXT ids
         self.events_processed = 0
+        self._events_inserted = 0  # Rows actually written, without duplicate ids
         self.batches_processed = 0
+        self._recorded_at_range: Tuple[Optional[int], Optional[int]] = (None, None)
+        self.database_size_mb: Optional[float] = None
 
         logger.info(f"Initializing SQLite store at {db_path}")
 
@@ -222,7 +393,12 @@ class SQLiteEventStore:
 
     def __exit__(self, exc_type, exc_val, exc_tb) -> None:
         """Context manager exit with proper cleanup."""
-        self.close()
+        try:
+            self.close()
+        except sqlite3.Error:
+            # Already logged by close(), do not mask the error of the import
+            if exc_type is None:
+                raise
 
     def connect(self) -> None:
         """Establish database connection and setup schema."""
@@ -233,16 +409,24 @@ class SQLiteEventStore:
                 isolation_level="DEFERRED",  # Better performance for batch operations
             )
 
-            # Configure SQLite for better performance
-            self.connection.execute("PRAGMA journal_mode=WAL")
-            self.connection.execute("PRAGMA synchronous=NORMAL")
-            self.connection.execute("PRAGMA cache_size=10000")
-            self.connection.execute("PRAGMA temp_store=MEMORY")
+            self._apply_pragmas()
 
+            # Indexes are deliberately not created here: building them once over
+            # the loaded data in close() is cheaper than maintaining them per
+            # row during the import. Queries issued mid-import are unindexed.
             self._create_schema()
 
-            if self.config.create_indexes:
-                self._create_indexes()
+            # Reuse one cursor for every batch insert
+            self._insert_cursor = self.connection.cursor()
+
+            # Hold the write lock for the whole import: one transaction means
+            # one fsync instead of one per commit
+            self.connection.execute("BEGIN IMMEDIATE")
+
+            if self.config.force and not self._fresh_import:
+                self.connection.execute("DELETE FROM events")
+                self._fresh_import = True
+                logger.info("Existing events cleared for a fresh import")
 
             logger.info("Database connection established and configured")
 
@@ -250,6 +434,27 @@ class SQLiteEventStore:
             logger.error(f"Failed to connect to database {self.db_path}: {e}")
             raise
 
+    def _apply_pragmas(self) -> None:
+        """Configure SQLite for better performance."""
+        # The page size only applies to a new database and must precede the
+        # first write (including the switch to WAL); existing files keep
+        # theirs. 8KB pages halve page writes for rows averaging over 4KB.
+        self.connection.execute("PRAGMA page_size=8192")
+        self.connection.execute("PRAGMA mmap_size=268435456")  # 256MB
+        self.connection.execute("PRAGMA cache_size=-131072")  # 128MB
+        self.connection.execute("PRAGMA temp_store=MEMORY")
+
+        if self.config.unsafe_fast_import:
+            # No rollback journal and no fsync: a crash mid-import leaves
+            # an unusable file and recovery means rerunning the conversion
+            self.connection.execute("PRAGMA journal_mode=OFF")
+            self.connection.execute("PRAGMA synchronous=OFF")
+            self.connection.execute("PRAGMA foreign_keys=OFF")
+        else:
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("PRAGMA synchronous=NORMAL")
+            self.connection.execute("PRAGMA wal_autocheckpoint=10000")
+
     def _create_schema(self) -> None:
         """Create database schema if it doesn't exist."""
         if not self.connection:
@@ -261,20 +466,32 @@ class SQLiteEventStore:
         )
 
         if cursor.fetchone() is not None:
-            logger.info("Events table already exists")
+            logger.info("Events table already exists, resuming (stored events are kept)")
+            self._fresh_import = False
+            # Databases from before the BLOB id format hold 36 char TEXT ids;
+            # keep writing that form so stored events are still matched
+            id_type = self.connection.execute(
+                "SELECT type FROM pragma_table_info('events') WHERE name = 'id'"
+            ).fetchone()
+            self._text_ids = id_type is not None and id_type[0].upper() == "TEXT"
+            if self._text_ids:
+                logger.warning(
+                    "Events table stores ids as TEXT (older format), "
+                    "resuming with TEXT ids; drop the database file to switch to BLOB ids"
+                )
             return
 
         # Create events table with better schema
         self.connection.execute(
             """
             CREATE TABLE events (
-                id TEXT PRIMARY KEY,
+                id BLOB PRIMARY KEY,
                 recorded_at INTEGER NOT NULL,
                 event_type TEXT NOT NULL,
                 stream_name TEXT NOT NULL,
-                data TEXT,
+                data BLOB,
                 eventstore_metadata TEXT,
-                processed_at INTEGER DEFAULT (strftime('%s', 'now')),
+                processed_at INTEGER,
                 
                 -- Add constraints
                 CHECK (recorded_at > 0),
@@ -296,10 +513,11 @@ class SQLiteEventStore:
         )
 
         self.connection.commit()
+        self._fresh_import = True
         logger.info("Database schema created successfully")
 
     def _create_indexes(self) -> None:
-        """Create performance indexes."""
+        """Create performance indexes (idempotent, safe on resumed runs)."""
         if not self.connection:
             raise RuntimeError("Database connection not established")
 
@@ -316,50 +534,72 @@ class SQLiteEventStore:
         self.connection.commit()
         logger.info("Database indexes created successfully")
 
-    def save_events_batch(self, events: List[SQLiteEvent]) -> None:
+    def save_events_batch(self, rows: List[EventRow]) -> None:
         """
         Save a batch of events to the database.
 
         Args:
-            events: List of events to save
+            rows: List of event rows to save, as built by event_to_row()
         """
-        if not events or not self.connection:
+        if not rows or not self._insert_cursor:
             return
 
-        values = [
-            (
-                event.id,
-                event.recorded_at,
-                event.type,
-                event.stream_name,
-                event.data,
-                event.eventstore_metadata,
-            )
-            for event in events
-        ]
+        # One processing time per batch rather than a strftime() call per row
+        processed_at = int(time.time())
 
         try:
-            self.connection.executemany(
-                """
-                INSERT OR REPLACE INTO events 
-                (id, recorded_at, event_type, stream_name, data, eventstore_metadata) 
-                VALUES (?, ?, ?, ?, ?, ?)
-            """,
-                values,
-            )
+            # One multi-row INSERT per chunk instead of one statement per row
+            rows_per_stmt = self.config.max_rows_per_stmt
+            for start in range(0, len(rows), rows_per_stmt):
+                chunk = rows[start : start + rows_per_stmt]
+                params: List[Any] = []
+                if self._text_ids:
+                    for row in chunk:
+                        params.append(_text_event_id(row[0]))
+                        params.extend(row[1:])
+                        params.append(processed_at)
+                else:
+                    for row in chunk:
+                        params.extend(row)
+                        params.append(processed_at)
+                self._insert_cursor.execute(self._insert_sql(len(chunk)), params)
+                self._events_inserted += self._insert_cursor.rowcount
 
-            self.events_processed += len(events)
+            self.events_processed += len(rows)
             self.batches_processed += 1
+            self._recorded_at_range = _merge_recorded_at_range(
+                self._recorded_at_range, rows
+            )
 
-            # Commit based on frequency setting
-            if self.batches_processed % self.config.commit_frequency == 0:
+            # Intermediate commits are opt-in (bounds WAL size on huge imports),
+            # by default everything is committed once in close()
+            if (
+                self.config.commit_frequency
+                and self.batches_processed % self.config.commit_frequency == 0
+            ):
                 self.connection.commit()
-                logger.debug(f"Committed batch {self.batches_processed}")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(f"Committed batch {self.batches_processed}")
 
         except sqlite3.Error as e:
             logger.error(f"Failed to save events batch: {e}")
             raise
 
+    def _insert_sql(self, row_count: int) -> str:
+        """Get the multi-row INSERT statement for a number of rows.
+
+        Only full-size statements are cached: the short last chunk of a batch
+        can have any size, so caching it would grow the cache without bound.
+        """
+        if row_count != self.config.max_rows_per_stmt:
+            return _build_insert_sql(row_count)
+
+        sql = self._insert_sql_cache.get(row_count)
+        if sql is None:
+            sql = _build_insert_sql(row_count)
+            self._insert_sql_cache[row_count] = sql
+        return sql
+
     def update_conversion_metadata(self, key: str, value: str) -> None:
         """Update conversion metadata for tracking progress."""
         if not self.connection:
@@ -378,56 +618,243 @@ class SQLiteEventStore:
         if not self.connection:
             return {}
 
-        cursor = self.connection.execute("SELECT COUNT(*) FROM events")
-        total_events = cursor.fetchone()[0]
+        if self._fresh_import:
+            # Every row in the table was inserted by this session, which
+            # avoids a full table scan for COUNT(*) and MIN/MAX
+            total_events = self._events_inserted
+            date_range = self._recorded_at_range
+        else:
+            # Resumed imports also hold rows from earlier runs
+            cursor = self.connection.execute("SELECT COUNT(*) FROM events")
+            total_events = cursor.fetchone()[0]
 
-        cursor = self.connection.execute(
+            cursor = self.connection.execute(
+                """
+                SELECT MIN(recorded_at), MAX(recorded_at) FROM events
             """
-            SELECT MIN(recorded_at), MAX(recorded_at) FROM events
-        """
-        )
-        date_range = cursor.fetchone()
+            )
+            date_range = cursor.fetchone()
 
         return {
             "total_events": total_events,
             "events_processed_this_session": self.events_processed,
             "batches_processed": self.batches_processed,
             "date_range": date_range,
-            "database_size_mb": self.db_path.stat().st_size / (1024 * 1024),
         }
 
     def close(self) -> None:
-        """Close database connection with final commit."""
-        if self.connection:
+        """
+        Build deferred indexes and close database connection with final commit.
+
+        Raises:
+            sqlite3.Error: If the index build or a commit fails; the
+                uncommitted part of the import is then rolled back
+        """
+        if not self.connection:
+            return
+
+        try:
+            # Build indexes once over the final dataset
+            if self.config.create_indexes:
+                self._create_indexes()
+
+            # Final commit
+            self.connection.commit()
+
+            # Restore durable settings once the bulk import is over
+            if self.config.unsafe_fast_import:
+                self.connection.execute("PRAGMA journal_mode=WAL")
+                self.connection.execute("PRAGMA synchronous=NORMAL")
+
+            # Update final statistics
+            self.update_conversion_metadata("last_conversion", str(int(time.time())))
+            self.update_conversion_metadata("total_events", str(self.events_processed))
+            self.connection.commit()
+
+        except sqlite3.Error as e:
+            logger.error(f"Error closing database: {e}")
+            raise
+        finally:
+            # Closing without a commit rolls back whatever is still pending
+            connection, self.connection = self.connection, None
+            self._insert_cursor = None
+            connection.close()
+
+        logger.info("Database connection closed")
+
+        # Measured once the WAL has been checkpointed on close,
+        # in-memory databases have no file
+        if str(self.db_path) != ":memory:":
             try:
-                # Final commit
-                self.connection.commit()
+                self.database_size_mb = self.db_path.stat().st_size / (1024 * 1024)
+            except OSError as e:
+                logger.warning(f"Could not measure database size: {e}")
 
-                # Update final statistics
-                self.update_conversion_metadata(
-                    "last_conversion", str(int(time.time()))
-                )
-                self.update_conversion_metadata(
-                    "total_events", str(self.events_processed)
-                )
-                self.connection.commit()
 
-                self.connection.close()
-                logger.info("Database connection closed")
+class ParquetEventStore:
+    """
+    Parquet file writer for EventStore events.
+
+    Alternative to SQLiteEventStore for outputs that are only scanned later
+    (DuckDB, pandas...): batches are appended as zstd compressed row groups,
+    without any B-tree maintenance. The output file is always rewritten.
+    """
+
+    def __init__(self, db_path: Path, config: ConversionConfig) -> None:
+        """
+        Initialize Parquet event store.
 
-            except sqlite3.Error as e:
-                logger.error(f"Error closing database: {e}")
+        Args:
+            db_path: Path to the Parquet output file
+            config: Conversion configuration
+        """
+        self.db_path = db_path
+        self.config = config
+        self.writer: Optional["pq.ParquetWriter"] = None
+        self.events_processed = 0
+        self.batches_processed = 0
+        self._recorded_at_range: Tuple[Optional[int], Optional[int]] = (None, None)
+        self.database_size_mb: Optional[float] = None
+
+        logger.info(f"Initializing Parquet store at {db_path}")
+
+    def __enter__(self) -> "ParquetEventStore":
+        """Context manager entry."""
+        self.connect()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        """Context manager exit with proper cleanup."""
+        try:
+            self.close()
+        except (_pyarrow().ArrowException, OSError):
+            # Already logged by close(), do not mask the error of the export
+            if exc_type is None:
+                raise
+
+    def connect(self) -> None:
+        """Open the Parquet writer."""
+        self.writer = _pyarrow().parquet.ParquetWriter(
+            str(self.db_path), _parquet_schema(), compression="zstd"
+        )
+        logger.info(f"Writing Parquet file {self.db_path}")
+
+    def save_events_batch(self, rows: List[EventRow]) -> None:
+        """
+        Append a batch of events to the Parquet file.
+
+        Args:
+            rows: List of event rows to save, as built by event_to_row()
+        """
+        if not rows or not self.writer:
+            return
+
+        processed_at = int(time.time())
+        columns: List[Any] = list(zip(*rows))
+        columns.append([processed_at] * len(rows))
+        self.writer.write_batch(
+            _pyarrow().RecordBatch.from_pydict(
+                dict(zip(EVENT_COLUMNS, columns)), schema=self.writer.schema
+            )
+        )
+
+        self.events_processed += len(rows)
+        self.batches_processed += 1
+        self._recorded_at_range = _merge_recorded_at_range(
+            self._recorded_at_range, rows
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get conversion statistics."""
+        if not self.writer:
+            return {}
+
+        return {
+            "total_events": self.events_processed,
+            "events_processed_this_session": self.events_processed,
+            "batches_processed": self.batches_processed,
+            "date_range": self._recorded_at_range,
+        }
+
+    def close(self) -> None:
+        """Write the Parquet footer and close the file."""
+        if self.writer:
+            try:
+                self.writer.close()
+                logger.info("Parquet file closed")
+                self.database_size_mb = self.db_path.stat().st_size / (1024 * 1024)
+            except (_pyarrow().ArrowException, OSError) as e:
+                # Without its footer the file cannot be read back
+                logger.error(f"Error closing Parquet file: {e}")
+                raise
             finally:
-                self.connection = None
+                self.writer = None
+
+
+def _pyarrow():
+    """Import pyarrow and its Parquet module on first use."""
+    import pyarrow
+    import pyarrow.parquet  # noqa: F401
+
+    return pyarrow
+
+
+def _parquet_schema() -> "pa.Schema":
+    """Arrow schema matching the columns of the SQLite events table."""
+    pa = _pyarrow()
+    return pa.schema(
+        [
+            ("id", pa.binary()),
+            ("recorded_at", pa.int64()),
+            ("event_type", pa.string()),
+            ("stream_name", pa.string()),
+            ("data", pa.binary()),
+            ("eventstore_metadata", pa.string()),
+            ("processed_at", pa.int64()),
+        ]
+    )
+
+
+def _build_insert_sql(row_count: int) -> str:
+    """Build the multi-row INSERT statement for a number of rows."""
+    return (
+        INSERT_EVENTS_SQL
+        + ", ".join([INSERT_ROW_PLACEHOLDER] * row_count)
+        + INSERT_EVENTS_CONFLICT_SQL
+    )
+
+
+def _text_event_id(event_id: Union[bytes, str]) -> str:
+    """Convert a row id back to the 36 char text form of older databases."""
+    if isinstance(event_id, bytes):
+        return str(UUID(bytes=event_id))
+    return event_id
+
+
+def _merge_recorded_at_range(
+    current: Tuple[Optional[int], Optional[int]], rows: List[EventRow]
+) -> Tuple[Optional[int], Optional[int]]:
+    """Extend a (min, max) recorded_at range with a batch of rows."""
+    batch_min = min(row[1] for row in rows)
+    batch_max = max(row[1] for row in rows)
+    low, high = current
+    return (
+        batch_min if low is None else min(low, batch_min),
+        batch_max if high is None else max(high, batch_max),
+    )
 
 
 @contextmanager
-def eventstore_client(uri: str) -> Iterator[EventStoreDBClient]:
+def eventstore_client(uri: str, strict: bool = False) -> Iterator[EventStoreDBClient]:
     """
     Context manager for EventStore client with proper cleanup.
 
+    The connection is not probed by default: the first read fails fast
+    anyway, so an extra round trip only delays startup.
+
     Args:
         uri: EventStore connection URI
+        strict: Whether to check the connection before yielding the client
 
     Yields:
         EventStoreDBClient instance
@@ -441,13 +868,13 @@ def eventstore_client(uri: str) -> Iterator[EventStoreDBClient]:
         logger.info(f"Connecting to EventStore at {uri}")
         client = EventStoreDBClient(uri=uri)
 
-        # Test connection by attempting to read from a non-existent stream
-        # This will validate the connection without side effects
-        try:
-            list(client.get_stream("__connection_test__", limit=1))
-        except Exception:
-            # Expected - stream doesn't exist, but connection is working
-            pass
+        if strict:
+            # $all has no stream metadata to fetch; reading its first record,
+            # unfiltered so no server-side scan is needed, is a single round trip
+            try:
+                list(client.read_all(limit=1, filter_exclude=()))
+            except Exception as e:
+                raise ConnectionError(f"EventStore connection check failed: {e}")
 
         yield client
 
@@ -466,6 +893,98 @@ def eventstore_client(uri: str) -> Iterator[EventStoreDBClient]:
                 logger.warning(f"Error closing EventStore client: {e}")
 
 
+def _chunked(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """Split an iterable into lists of at most size items."""
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class EventBatchReader(threading.Thread):
+    """
+    Background reader turning an EventStore read into batches of event rows.
+
+    Batches are handed over through a bounded queue, which provides
+    backpressure when the SQLite writer falls behind. Iterating the reader
+    yields the batches and re-raises any error hit while reading.
+    """
+
+    def __init__(
+        self,
+        events: Iterable[RecordedEvent],
+        batch_size: int,
+        validate: bool,
+        max_pending_batches: int = READ_AHEAD_BATCHES,
+    ) -> None:
+        """
+        Initialize the batch reader.
+
+        Args:
+            events: EventStore events to read
+            batch_size: Number of rows per batch
+            validate: Whether to validate event data
+            max_pending_batches: Batches buffered ahead of the writer
+        """
+        super().__init__(name="eventstore-reader", daemon=True)
+        self.events = events
+        self.batch_size = batch_size
+        self.validate = validate
+        self.skipped_events = 0
+        self.error: Optional[Exception] = None
+        self._batches: "queue.Queue[Optional[List[EventRow]]]" = queue.Queue(
+            maxsize=max_pending_batches
+        )
+        self._stopped = threading.Event()
+
+    def run(self) -> None:
+        """Read events and queue batches, then an end-of-stream sentinel."""
+        try:
+            for raw_batch in _chunked(self.events, self.batch_size):
+                events_batch: List[EventRow] = []
+                for event in raw_batch:
+                    try:
+                        events_batch.append(event_to_row(event, self.validate))
+                    except EventValidationError as e:
+                        logger.warning(f"Skipping invalid event {event.id}: {e}")
+                        self.skipped_events += 1
+
+                if events_batch and not self._put(events_batch):
+                    return
+
+        except Exception as e:
+            self.error = e
+        finally:
+            self._put(None)
+
+    def _put(self, item: Optional[List[EventRow]]) -> bool:
+        """Queue an item, giving up if the reader is stopped while waiting."""
+        while not self._stopped.is_set():
+            try:
+                self._batches.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def stop(self) -> None:
+        """Ask the reader to stop queueing batches."""
+        self._stopped.set()
+
+    def __iter__(self) -> Iterator[List[EventRow]]:
+        """Yield queued batches until the end of the stream."""
+        while True:
+            events_batch = self._batches.get()
+            if events_batch is None:
+                break
+            yield events_batch
+
+        if self.error is not None:
+            raise self.error
+
+
 def convert_events(config: ConversionConfig) -> Dict[str, Any]:
     """
     Convert events from EventStore to SQLite.
@@ -483,48 +1002,46 @@ def convert_events(config: ConversionConfig) -> Dict[str, Any]:
     start_time = time.time()
     logger.info(f"Starting event conversion with config: {config}")
 
-    with eventstore_client(config.eventstore_uri) as client:
-        with SQLiteEventStore(config.db_path, config) as db:
+    with eventstore_client(config.eventstore_uri, config.strict_connect) as client:
+        store_class = (
+            ParquetEventStore if config.output_format == "parquet" else SQLiteEventStore
+        )
+        with store_class(config.db_path, config) as db:
 
             try:
                 # Read all events from EventStore
                 logger.info("Reading events from EventStore...")
                 read_response = client.read_all()
 
-                events_batch = []
                 total_processed = 0
-                skipped_events = 0
+                batches_saved = 0
+
+                # Reading and row building run in a background thread so the
+                # network reads overlap with the SQLite writes below
+                reader = EventBatchReader(
+                    read_response, config.batch_size, config.validate_data
+                )
+                reader.start()
 
                 try:
-                    for event in read_response:
-                        try:
-                            sqlite_event = SQLiteEvent(event, config.validate_data)
-                            events_batch.append(sqlite_event)
-
-                            # Process batch when full
-                            if len(events_batch) >= config.batch_size:
-                                db.save_events_batch(events_batch)
-                                total_processed += len(events_batch)
-
-                                if total_processed % (config.batch_size * 10) == 0:
-                                    logger.info(
-                                        f"Processed {total_processed} events..."
-                                    )
-
-                                events_batch = []
-
-                        except EventValidationError as e:
-                            logger.warning(f"Skipping invalid event {event.id}: {e}")
-                            skipped_events += 1
-                            continue
-
-                    # Process remaining events in the last batch
-                    if events_batch:
+                    for events_batch in reader:
                         db.save_events_batch(events_batch)
                         total_processed += len(events_batch)
+                        batches_saved += 1
+
+                        # Batches are short when events were skipped, so
+                        # progress is reported every 10 batches
+                        if batches_saved % 10 == 0 and logger.isEnabledFor(
+                            logging.INFO
+                        ):
+                            logger.info(f"Processed {total_processed} events...")
 
                 finally:
+                    reader.stop()
                     read_response.stop()
+                    reader.join()
+
+                skipped_events = reader.skipped_events
 
                 # Get final statistics
                 stats = db.get_stats()
@@ -540,13 +1057,16 @@ def convert_events(config: ConversionConfig) -> Dict[str, Any]:
                     }
                 )
 
-                logger.info(f"Conversion completed successfully: {stats}")
-                return stats
-
             except Exception as e:
                 logger.error(f"Error during event conversion: {e}")
                 raise
 
+    # The database size is only known once the store has been closed
+    stats["database_size_mb"] = db.database_size_mb
+
+    logger.info(f"Conversion completed successfully: {stats}")
+    return stats
+
 
 def create_config_from_args(args: argparse.Namespace) -> ConversionConfig:
     """
@@ -577,6 +1097,10 @@ def create_config_from_args(args: argparse.Namespace) -> ConversionConfig:
         commit_frequency=args.commit_frequency,
         validate_data=not args.skip_validation,
         create_indexes=not args.skip_indexes,
+        unsafe_fast_import=args.unsafe_fast_import,
+        force=args.force,
+        strict_connect=args.strict_connect,
+        output_format=args.format,
     )
 
 
@@ -590,6 +1114,8 @@ Examples:
   %(prog)s --db events.db
   %(prog)s --db events.db --batch-size 500 --commit-frequency 10
   %(prog)s --db events.db --skip-validation --skip-indexes
+  %(prog)s --db events.db --unsafe-fast-import
+  %(prog)s --db events.parquet --format parquet
 
 Environment Variables:
   EVENTSTORE_URI    EventStore connection string (required)
@@ -604,6 +1130,13 @@ Environment Variables:
         help=f"Path to SQLite database file (default: {DEFAULT_DB_PATH})",
     )
 
+    parser.add_argument(
+        "--format",
+        choices=OUTPUT_FORMATS,
+        default="sqlite",
+        help="Output format, parquet requires pyarrow and writes --db as a Parquet file (default: sqlite)",
+    )
+
     parser.add_argument(
         "--batch-size",
         type=int,
@@ -614,8 +1147,8 @@ Environment Variables:
     parser.add_argument(
         "--commit-frequency",
         type=int,
-        default=5,
-        help="Commit to database every N batches (default: 5)",
+        default=DEFAULT_COMMIT_FREQUENCY,
+        help="Commit to database every N batches, 0 commits once at the end (default: 0)",
     )
 
     parser.add_argument(
@@ -630,11 +1163,38 @@ Environment Variables:
         help="Skip creating database indexes (faster initial import)",
     )
 
+    parser.add_argument(
+        "--unsafe-fast-import",
+        action="store_true",
+        help="Disable journaling and fsync during import (a crash means rerunning the conversion)",
+    )
+
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Delete events already in the database before importing",
+    )
+
+    parser.add_argument(
+        "--strict-connect",
+        action="store_true",
+        help="Check the EventStore connection before starting the conversion",
+    )
+
     parser.add_argument(
         "--version", action="version", version="EventStore SQLite Converter 1.0.0"
     )
 
     args = parser.parse_args()
+    if args.format == "parquet":
+        # The Parquet file is always rewritten and has no journal to disable
+        for option, enabled in (
+            ("--force", args.force),
+            ("--unsafe-fast-import", args.unsafe_fast_import),
+        ):
+            if enabled:
+                parser.error(f"{option} only applies to --format sqlite")
+    _add_file_logging()
 
     try:
         # Create and validate configuration
@@ -651,7 +1211,8 @@ Environment Variables:
         print(f"Total events: {stats['total_events']:,}")
         print(f"Duration: {stats['conversion_duration_seconds']:.2f} seconds")
         print(f"Rate: {stats['events_per_second']:.1f} events/second")
-        print(f"Database size: {stats['database_size_mb']:.2f} MB")
+        if stats.get("database_size_mb") is not None:
+            print(f"Database size: {stats['database_size_mb']:.2f} MB")
 
         if stats["skipped_events"] > 0:
             print(f"Skipped events: {stats['skipped_events']:,}")
@@ -3,71 +3,174 @@ Common test fixtures and configuration. (Generated using Claude.ai)
 """
 
 import pytest
-import tempfile
 from pathlib import Path
-from unittest.mock import Mock
+from unittest.mock import Mock, MagicMock
+from dataclasses import dataclass
 from datetime import datetime
+from typing import Any, Optional
+
+# conftest.py is loaded before any test module is collected, so importing
+# main here pays its import cost (esdbclient, logging setup) once per
+# process, including each pytest-xdist worker
 from main import ConversionConfig
 
 
+def pytest_collection_modifyitems(config, items):
+    """Skip the perf tests unless the marker expression selects them."""
+    if "perf" in config.getoption("markexpr"):
+        return
+    skip_perf = pytest.mark.skip(reason="throughput test, run with -m perf")
+    for item in items:
+        if "perf" in item.keywords:
+            item.add_marker(skip_perf)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def eventstore_uri_env():
+    """Provide the EventStore URI through the environment for the whole session."""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("EVENTSTORE_URI", "esdb://localhost:2113")
+        yield
+
+
+@pytest.fixture(scope="class")
+def tmp_root(tmp_path_factory):
+    """Temporary directory shared by the test databases of a test class."""
+    return tmp_path_factory.mktemp("db")
+
+
+@pytest.fixture
+def temp_db_path(tmp_root, request):
+    """Path for a test database, only created once the store connects."""
+    # Named after the test so it is unique within the class directory; pytest
+    # removes old temporary directories itself, no per-test unlink needed
+    return tmp_root / f"{request.node.name}.db"
+
+
 @pytest.fixture
-def temp_db_path():
-    """Create a temporary database path for testing."""
-    with tempfile.NamedTemporaryFile(suffix='.db', delete=False) as f:
-        temp_path = Path(f.name)
-    yield temp_path
-    # Cleanup
-    if temp_path.exists():
-        temp_path.unlink()
+def mem_db_path():
+    """In-memory database path, for tests that never reopen the database."""
+    return Path(":memory:")
+
+
+def _sqlite_object_exists(conn, kind, name):
+    """Check for a schema object through an indexed sqlite_master lookup."""
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = ? AND name = ? LIMIT 1",
+        (kind, name)
+    ).fetchone() is not None
 
 
 @pytest.fixture
-def sample_config(temp_db_path):
-    """Create a sample configuration for testing."""
+def sqlite_object_exists():
+    """Lookup helper checking whether a table or index exists."""
+    return _sqlite_object_exists
+
+
+@pytest.fixture(scope="session")
+def config(tmp_path_factory):
+    """Create a sample configuration for testing, shared by the session (it is frozen)."""
     return ConversionConfig(
         eventstore_uri="esdb://localhost:2113",
-        db_path=temp_db_path,
+        db_path=tmp_path_factory.mktemp("cfg") / "test.db",
         batch_size=100,
         commit_frequency=5
     )
 
 
+_FIXED_DT = datetime(2023, 1, 1, 12, 0, 0)
+_FIXED_DATA = '{"test": "data"}'
+
+
+@dataclass
+class FakeEvent:
+    """Passive stand-in for an EventStore RecordedEvent, with test defaults."""
+    # No slots: like RecordedEvent, the metadata serializer reads __dict__
+    id: Any = 'test-event-id'
+    type: Optional[str] = 'TestEvent'
+    stream_name: Optional[str] = 'test-stream'
+    recorded_at: datetime = _FIXED_DT
+    data: Any = _FIXED_DATA
+    stream_position: Optional[int] = 1
+    commit_position: Optional[int] = 100
+    prepare_position: Optional[int] = 99
+    retry_count: Optional[int] = 0
+    link: Any = None
+    content_type: str = 'application/json'
+    created: datetime = _FIXED_DT
+
+
+def _make_mock_event(**kwargs):
+    """Build a fake EventStore event, kwargs override the defaults."""
+    return FakeEvent(**kwargs)
+
+
 @pytest.fixture
 def mock_event():
-    """Create a mock EventStore event for testing."""
-    event = Mock()
-    event.id = 'test-event-id'
-    event.type = 'TestEvent'
-    event.stream_name = 'test-stream'
-    event.recorded_at = datetime(2023, 1, 1, 12, 0, 0)
-    event.data = '{"test": "data"}'
-    event.stream_position = 1
-    event.commit_position = 100
-    event.prepare_position = 99
-    event.retry_count = 0
-    event.link = None
-    event.content_type = 'application/json'
-    event.created = datetime(2023, 1, 1, 12, 0, 0)
-    return event
+    """Create a fake EventStore event for testing."""
+    return _make_mock_event()
 
 
-@pytest.fixture
-def mock_eventstore_client():
-    """Create a mock EventStore client for testing."""
-    client = Mock()
-    client.read_all.return_value = Mock()
-    return client
+@pytest.fixture(scope="module")
+def default_mock_event():
+    """Fake EventStore event with the default values, shared read-only by a module."""
+    return _make_mock_event()
 
 
-@pytest.fixture
-def mock_sqlite_store():
-    """Create a mock SQLite store for testing."""
-    store = Mock()
+@pytest.fixture(scope="session")
+def mock_event_factory():
+    """Factory building fake EventStore events with overridden attributes."""
+    return _make_mock_event
+
+
+def _set_store_defaults(store):
+    """Configure the default return values of a mock store."""
     store.get_stats.return_value = {
         'total_events': 0,
         'events_processed_this_session': 0,
         'batches_processed': 0,
         'date_range': (None, None),
-        'database_size_mb': 0.0
     }
+    store.database_size_mb = 0.0
+
+
+def _set_client_defaults(client):
+    """Configure the default return values of a mock EventStore client."""
+    client.read_all.return_value = MagicMock()
+
+
+@pytest.fixture(scope="session")
+def mock_eventstore_client():
+    """Create a mock EventStore client, shared by the whole session."""
+    client = Mock()
+    _set_client_defaults(client)
+    return client
+
+
+@pytest.fixture(scope="session")
+def mock_sqlite_store():
+    """Create a mock SQLite store, shared by the whole session."""
+    store = Mock()
+    _set_store_defaults(store)
     return store
+
+
+@pytest.fixture
+def mock_read_response(mock_eventstore_client):
+    """Read response returned by the shared mock client's read_all()."""
+    return mock_eventstore_client.read_all.return_value
+
+
+@pytest.fixture(autouse=True)
+def reset_mocks(request):
+    """Reset the shared session mocks after every test that used them."""
+    yield
+    # Return values and side effects set by a test must not leak into the next
+    if 'mock_eventstore_client' in request.fixturenames:
+        client = request.getfixturevalue('mock_eventstore_client')
+        client.reset_mock(return_value=True, side_effect=True)
+        _set_client_defaults(client)
+    if 'mock_sqlite_store' in request.fixturenames:
+        store = request.getfixturevalue('mock_sqlite_store')
+        store.reset_mock(return_value=True, side_effect=True)
+        _set_store_defaults(store)
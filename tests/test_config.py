@@ -3,77 +3,118 @@ Tests for ConversionConfig class. (Generated using Claude.ai)
 """
 
 import pytest
+from dataclasses import FrozenInstanceError, replace
 from pathlib import Path
-from unittest.mock import patch
+from unittest.mock import Mock, patch
 from main import ConversionConfig
 
 
+@pytest.fixture(scope="class")
+def default_config(tmp_path_factory):
+    """Default configuration shared by the read-only tests of a class."""
+    return ConversionConfig(
+        eventstore_uri="esdb://localhost:2113",
+        db_path=tmp_path_factory.mktemp("cfg") / "test.db"
+    )
+
+
 class TestConversionConfig:
     """Test cases for ConversionConfig class."""
 
-    def test_valid_config(self):
+    @pytest.fixture(autouse=True)
+    def skip_mkdir(self, request, monkeypatch):
+        """Skip creating the parent directory unless the test uses tmp_path."""
+        # tmp_path itself needs the real Path.mkdir
+        if 'tmp_path' not in request.fixturenames:
+            monkeypatch.setattr(Path, 'mkdir', Mock())
+
+    @pytest.mark.parametrize("kwargs,expected", [
+        pytest.param(
+            {},
+            {'batch_size': 4680, 'commit_frequency': 0,  # single transaction
+             'validate_data': True, 'create_indexes': True},
+            id="defaults",
+        ),
+        pytest.param(
+            {'batch_size': 500, 'commit_frequency': 10,
+             'validate_data': False, 'create_indexes': False},
+            {'batch_size': 500, 'commit_frequency': 10,
+             'validate_data': False, 'create_indexes': False},
+            id="custom",
+        ),
+    ])
+    def test_valid_config(self, kwargs, expected):
         """Test creating a valid configuration."""
         config = ConversionConfig(
             eventstore_uri="esdb://localhost:2113",
-            db_path=Path("test.db")
+            db_path=Path("test.db"),
+            **kwargs
         )
         
         assert config.eventstore_uri == "esdb://localhost:2113"
         assert config.db_path == Path("test.db")
-        assert config.batch_size == 1000  # default value
-        assert config.commit_frequency == 5  # default value
-        assert config.validate_data is True  # default value
-        assert config.create_indexes is True  # default value
+        for name, value in expected.items():
+            assert getattr(config, name) == value
 
-    def test_custom_config(self):
-        """Test creating configuration with custom values."""
-        config = ConversionConfig(
-            eventstore_uri="esdb://localhost:2113",
-            db_path=Path("custom.db"),
-            batch_size=500,
-            commit_frequency=10,
-            validate_data=False,
-            create_indexes=False
-        )
+    @pytest.mark.parametrize("kwargs,match", [
+        pytest.param({'eventstore_uri': ""}, "EventStore URI is required", id="empty-uri"),
+        pytest.param({'eventstore_uri': None}, "EventStore URI is required", id="none-uri"),
+        pytest.param({'batch_size': 0}, "Batch size must be positive", id="zero-batch-size"),
+        pytest.param({'commit_frequency': -1}, "Commit frequency must not be negative", id="negative-commit-frequency"),
+        pytest.param({'output_format': "csv"}, "Unsupported output format", id="unsupported-format"),
+    ])
+    def test_invalid_config_raises_error(self, kwargs, match):
+        """Test that invalid settings raise ValueError."""
+        values = {'eventstore_uri': "esdb://localhost:2113", 'db_path': Path("test.db")}
+        values.update(kwargs)
         
-        assert config.batch_size == 500
-        assert config.commit_frequency == 10
-        assert config.validate_data is False
-        assert config.create_indexes is False
+        with pytest.raises(ValueError, match=match):
+            ConversionConfig(**values)
 
-    def test_empty_eventstore_uri_raises_error(self):
-        """Test that empty EventStore URI raises ValueError."""
-        with pytest.raises(ValueError, match="EventStore URI is required"):
-            ConversionConfig(
-                eventstore_uri="",
-                db_path=Path("test.db")
-            )
+    def test_parquet_without_pyarrow_raises_error(self):
+        """Test that parquet output requires pyarrow."""
+        with patch('main.PYARROW_AVAILABLE', False):
+            with pytest.raises(ValueError, match="requires pyarrow"):
+                ConversionConfig(
+                    eventstore_uri="esdb://localhost:2113",
+                    db_path=Path("test.parquet"),
+                    output_format="parquet"
+                )
 
-    def test_none_eventstore_uri_raises_error(self):
-        """Test that None EventStore URI raises ValueError."""
-        with pytest.raises(ValueError, match="EventStore URI is required"):
-            ConversionConfig(
-                eventstore_uri=None,  # type: ignore
-                db_path=Path("test.db")
-            )
-
-    def test_negative_batch_size_raises_error(self):
-        """Test that negative batch size raises ValueError."""
-        with pytest.raises(ValueError, match="Batch size must be positive"):
-            ConversionConfig(
+    def test_max_rows_per_stmt_fits_variable_limit(self):
+        """Test that multi-row INSERTs stay under the SQLite parameter limit."""
+        with patch('main._sqlite_variable_limit', return_value=999):
+            config = ConversionConfig(
                 eventstore_uri="esdb://localhost:2113",
                 db_path=Path("test.db"),
-                batch_size=0
+                batch_size=10000
             )
+        
+        assert config.max_rows_per_stmt == 999 // 7
 
-    def test_negative_commit_frequency_raises_error(self):
-        """Test that negative commit frequency raises ValueError."""
-        with pytest.raises(ValueError, match="Commit frequency must be positive"):
-            ConversionConfig(
-                eventstore_uri="esdb://localhost:2113",
-                db_path=Path("test.db"),
-                commit_frequency=0
-            )
+    def test_max_rows_per_stmt_capped_by_batch_size(self):
+        """Test that small batches use a single INSERT."""
+        config = ConversionConfig(
+            eventstore_uri="esdb://localhost:2113",
+            db_path=Path("test.db"),
+            batch_size=10
+        )
+        
+        assert config.max_rows_per_stmt == 10
+
+    def test_config_is_frozen(self, default_config):
+        """Test that variants are derived with replace() and validated again."""
+        with pytest.raises(FrozenInstanceError):
+            default_config.batch_size = 10
+        
+        config = replace(default_config, batch_size=10)
+        assert config.max_rows_per_stmt == 10
+        assert default_config.batch_size == 4680
+        # A default batch is written with a single statement
+        assert default_config.max_rows_per_stmt == default_config.batch_size
+        
+        with pytest.raises(ValueError, match="Batch size must be positive"):
+            replace(default_config, batch_size=0)
 
     def test_parent_directory_creation(self, tmp_path):
         """Test that parent directory is created if it doesn't exist."""
@@ -87,14 +128,9 @@ class TestConversionConfig:
         assert db_path.parent.exists()
         assert db_path.parent.is_dir()
 
-    def test_string_representation(self):
+    def test_string_representation(self, default_config):
         """Test string representation of config."""
-        config = ConversionConfig(
-            eventstore_uri="esdb://localhost:2113",
-            db_path=Path("test.db")
-        )
-        
-        config_str = str(config)
+        config_str = str(default_config)
         assert "eventstore_uri='esdb://localhost:2113'" in config_str
-        assert "db_path=PosixPath('test.db')" in config_str
-        assert "batch_size=1000" in config_str
+        assert f"db_path={default_config.db_path!r}" in config_str
+        assert "batch_size=4680" in config_str
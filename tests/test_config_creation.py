@@ -3,9 +3,8 @@ Tests for create_config_from_args function. (Generated using Claude.ai)
 """
 
 import pytest
-import os
 from pathlib import Path
-from unittest.mock import patch, Mock
+from unittest.mock import Mock
 from main import create_config_from_args, ConversionConfig
 
 
@@ -21,9 +20,12 @@ class TestCreateConfigFromArgs:
         args.commit_frequency = 10
         args.skip_validation = False
         args.skip_indexes = False
+        args.unsafe_fast_import = False
+        args.force = False
+        args.strict_connect = False
+        args.format = 'sqlite'
         return args
 
-    @patch.dict(os.environ, {'EVENTSTORE_URI': 'esdb://localhost:2113'})
     def test_create_config_with_defaults(self, mock_args):
         """Test creating configuration with default values."""
         config = create_config_from_args(mock_args)
@@ -34,24 +36,33 @@ class TestCreateConfigFromArgs:
         assert config.commit_frequency == 10
         assert config.validate_data is True
         assert config.create_indexes is True
-
-    @patch.dict(os.environ, {'EVENTSTORE_URI': 'esdb://localhost:2113'})
-    def test_create_config_with_skip_validation(self, mock_args):
-        """Test creating configuration with validation disabled."""
-        mock_args.skip_validation = True
+        assert config.unsafe_fast_import is False
+        assert config.force is False
+        assert config.strict_connect is False
+        assert config.output_format == 'sqlite'
+
+    def test_create_config_with_unsafe_fast_import(self, mock_args):
+        """Test creating configuration with the unsafe fast import mode."""
+        mock_args.unsafe_fast_import = True
         config = create_config_from_args(mock_args)
         
-        assert config.validate_data is False
-
-    @patch.dict(os.environ, {'EVENTSTORE_URI': 'esdb://localhost:2113'})
-    def test_create_config_with_skip_indexes(self, mock_args):
-        """Test creating configuration with indexes disabled."""
-        mock_args.skip_indexes = True
+        assert config.unsafe_fast_import is True
+
+    @pytest.mark.parametrize("skip_validation,skip_indexes,expect_validate,expect_indexes", [
+        pytest.param(True, False, False, True, id="skip-validation"),
+        pytest.param(False, True, True, False, id="skip-indexes"),
+        pytest.param(True, True, False, False, id="skip-all"),
+    ])
+    def test_create_config_with_skip_options(self, mock_args, skip_validation, skip_indexes,
+                                             expect_validate, expect_indexes):
+        """Test creating configuration with validation and/or indexes disabled."""
+        mock_args.skip_validation = skip_validation
+        mock_args.skip_indexes = skip_indexes
         config = create_config_from_args(mock_args)
         
-        assert config.create_indexes is False
+        assert config.validate_data is expect_validate
+        assert config.create_indexes is expect_indexes
 
-    @patch.dict(os.environ, {'EVENTSTORE_URI': 'esdb://localhost:2113'})
     def test_create_config_with_custom_values(self, mock_args):
         """Test creating configuration with custom values."""
         mock_args.batch_size = 1000
@@ -61,7 +72,6 @@ class TestCreateConfigFromArgs:
         assert config.batch_size == 1000
         assert config.commit_frequency == 5
 
-    @patch.dict(os.environ, {'EVENTSTORE_URI': 'esdb://localhost:2113'})
     def test_create_config_with_relative_path(self, mock_args):
         """Test creating configuration with relative path."""
         mock_args.db = "data/events.db"
@@ -70,33 +80,26 @@ class TestCreateConfigFromArgs:
         assert config.db_path.name == "events.db"
         assert config.db_path.parent.name == "data"
 
-    @patch.dict(os.environ, {'EVENTSTORE_URI': 'esdb://localhost:2113'})
-    def test_create_config_with_absolute_path(self, mock_args):
+    def test_create_config_with_absolute_path(self, mock_args, tmp_path):
         """Test creating configuration with absolute path."""
-        # Use a path that can actually be created
-        import tempfile
-        with tempfile.TemporaryDirectory() as temp_dir:
-            mock_args.db = str(Path(temp_dir) / "events.db")
-            config = create_config_from_args(mock_args)
-            
-            assert config.db_path.name == "events.db"
-
-    def test_missing_eventstore_uri_raises_error(self, mock_args):
+        mock_args.db = str(tmp_path / "events.db")
+        config = create_config_from_args(mock_args)
+        
+        assert config.db_path.name == "events.db"
+
+    def test_missing_eventstore_uri_raises_error(self, mock_args, monkeypatch):
         """Test that missing EVENTSTORE_URI raises ValueError."""
-        # Clear environment variable
-        if 'EVENTSTORE_URI' in os.environ:
-            del os.environ['EVENTSTORE_URI']
+        monkeypatch.delenv('EVENTSTORE_URI')
         
         with pytest.raises(ValueError, match="EVENTSTORE_URI environment variable is required"):
             create_config_from_args(mock_args)
 
-    @patch.dict(os.environ, {'EVENTSTORE_URI': ''})
-    def test_empty_eventstore_uri_raises_error(self, mock_args):
+    def test_empty_eventstore_uri_raises_error(self, mock_args, monkeypatch):
         """Test that empty EVENTSTORE_URI raises ValueError."""
+        monkeypatch.setenv('EVENTSTORE_URI', '')
         with pytest.raises(ValueError, match="EVENTSTORE_URI environment variable is required"):
             create_config_from_args(mock_args)
 
-    @patch.dict(os.environ, {'EVENTSTORE_URI': 'esdb://localhost:2113'})
     def test_config_validation_after_creation(self, mock_args):
         """Test that configuration validation occurs after creation."""
         # This test verifies that the ConversionConfig.__post_init__ method
@@ -107,9 +110,8 @@ class TestCreateConfigFromArgs:
         # The config should be valid
         assert config.eventstore_uri == 'esdb://localhost:2113'
         assert config.batch_size > 0
-        assert config.commit_frequency > 0
+        assert config.commit_frequency >= 0
 
-    @patch.dict(os.environ, {'EVENTSTORE_URI': 'esdb://localhost:2113'})
     def test_db_path_resolution(self, mock_args):
         """Test that database path is properly resolved."""
         mock_args.db = "nested/dir/events.db"
@@ -118,29 +120,16 @@ class TestCreateConfigFromArgs:
         # The path should be resolved to an absolute path
         assert config.db_path.is_absolute() or config.db_path == Path("nested/dir/events.db")
 
-    @patch.dict(os.environ, {'EVENTSTORE_URI': 'esdb://localhost:2113'})
-    def test_environment_variable_priority(self, mock_args):
+    def test_environment_variable_priority(self, mock_args, monkeypatch):
         """Test that EVENTSTORE_URI from environment takes priority."""
         # Set environment variable
-        os.environ['EVENTSTORE_URI'] = 'esdb://production:2113'
+        monkeypatch.setenv('EVENTSTORE_URI', 'esdb://production:2113')
         
         config = create_config_from_args(mock_args)
         
         # Should use environment variable, not any default
         assert config.eventstore_uri == 'esdb://production:2113'
 
-    @patch.dict(os.environ, {'EVENTSTORE_URI': 'esdb://localhost:2113'})
-    def test_all_skip_options(self, mock_args):
-        """Test creating configuration with all skip options enabled."""
-        mock_args.skip_validation = True
-        mock_args.skip_indexes = True
-        
-        config = create_config_from_args(mock_args)
-        
-        assert config.validate_data is False
-        assert config.create_indexes is False
-
-    @patch.dict(os.environ, {'EVENTSTORE_URI': 'esdb://localhost:2113'})
     def test_none_values_in_args(self, mock_args):
         """Test handling of None values in arguments."""
         # Test that None values are handled gracefully
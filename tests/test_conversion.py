@@ -3,75 +3,75 @@ Tests for convert_events function. (Generated using Claude.ai)
 """
 
 import pytest
-import tempfile
-from pathlib import Path
-from unittest.mock import Mock, patch, MagicMock
-from datetime import datetime
-from main import convert_events, ConversionConfig, SQLiteEvent, EventValidationError
+from dataclasses import replace
+from itertools import repeat
+from types import SimpleNamespace
+from unittest.mock import Mock, MagicMock
+from main import convert_events
+
+
+def _stats(total=0, batches=0):
+    """Build a get_stats() result for a store that saved total events."""
+    return {
+        'total_events': total,
+        'events_processed_this_session': total,
+        'batches_processed': batches,
+        'date_range': (1640995200, 1640995200) if total else (None, None),
+    }
+
+
+class _ContextManagerStub:
+    """Context manager yielding a prebuilt object, without Mock dispatch."""
+
+    def __init__(self, inner):
+        self.inner = inner
+
+    def __enter__(self):
+        return self.inner
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return False
 
 
 class TestConvertEvents:
     """Test cases for convert_events function."""
 
-    @pytest.fixture
-    def temp_db_path(self):
-        """Create a temporary database path for testing."""
-        with tempfile.NamedTemporaryFile(suffix='.db', delete=False) as f:
-            temp_path = Path(f.name)
-        yield temp_path
-        # Cleanup
-        if temp_path.exists():
-            temp_path.unlink()
+    @pytest.fixture(autouse=True)
+    def patch_main(self, monkeypatch, mock_eventstore_client, mock_sqlite_store):
+        """Route convert_events to the shared mock client and store."""
+        client_cm = _ContextManagerStub(mock_eventstore_client)
+        store_class = MagicMock()
+        store_class.return_value.__enter__.return_value = mock_sqlite_store
+        monkeypatch.setattr('main.eventstore_client', lambda *args, **kwargs: client_cm)
+        monkeypatch.setattr('main.SQLiteEventStore', store_class)
+        return SimpleNamespace(store_class=store_class)
 
-    @pytest.fixture
-    def config(self, temp_db_path):
-        """Create a test configuration."""
-        return ConversionConfig(
-            eventstore_uri="esdb://localhost:2113",
-            db_path=temp_db_path,
-            batch_size=100,
-            commit_frequency=2
-        )
-
-    @pytest.fixture
-    def mock_event(self):
-        """Create a mock EventStore event."""
-        event = Mock()
-        event.id = 'test-event-id'
-        event.type = 'TestEvent'
-        event.stream_name = 'test-stream'
-        event.recorded_at = datetime(2023, 1, 1, 12, 0, 0)
-        event.data = '{"test": "data"}'
-        event.stream_position = 1
-        event.commit_position = 100
-        event.prepare_position = 99
-        event.retry_count = 0
-        event.link = None
-        event.content_type = 'application/json'
-        event.created = datetime(2023, 1, 1, 12, 0, 0)
-        return event
+    def test_parquet_output_format(self, patch_main, monkeypatch, config, mock_event, mock_sqlite_store, mock_read_response):
+        """Test that the parquet format writes through ParquetEventStore."""
+        monkeypatch.setattr('main.PYARROW_AVAILABLE', True)
+        config = replace(config, output_format='parquet')
+        mock_read_response.__iter__.return_value = iter([mock_event])
+        
+        # The shared mock store stands in for the Parquet store
+        mock_sqlite_store.database_size_mb = 0.1
+        parquet_store_class = MagicMock()
+        parquet_store_class.return_value.__enter__.return_value = mock_sqlite_store
+        monkeypatch.setattr('main.ParquetEventStore', parquet_store_class)
+        
+        stats = convert_events(config)
+        
+        parquet_store_class.assert_called_once_with(config.db_path, config)
+        patch_main.store_class.assert_not_called()
+        mock_sqlite_store.save_events_batch.assert_called_once()
+        assert stats['database_size_mb'] == 0.1
 
-    @patch('main.eventstore_client')
-    @patch('main.SQLiteEventStore')
-    def test_successful_conversion(self, mock_sqlite_store_class, mock_eventstore_client, config, mock_event):
+    def test_successful_conversion(self, config, mock_event, mock_sqlite_store, mock_read_response):
         """Test successful event conversion."""
         # Mock EventStore client
-        mock_client = Mock()
-        mock_read_response = Mock()
-        mock_read_response.__iter__ = Mock(return_value=iter([mock_event]))
-        mock_client.read_all.return_value = mock_read_response
-        mock_eventstore_client.return_value.__enter__.return_value = mock_client
+        mock_read_response.__iter__.return_value = iter([mock_event])
         
         # Mock SQLite store
-        mock_store = Mock()
-        mock_sqlite_store_class.return_value.__enter__.return_value = mock_store
-        mock_store.get_stats.return_value = {
-            'total_events': 1,
-            'events_processed_this_session': 1,
-            'batches_processed': 1,
-            'date_range': (1640995200, 1640995200),
-            'database_size_mb': 0.1
-        }
+        mock_sqlite_store.get_stats.return_value = _stats(total=1, batches=1)
         
         # Run conversion
         stats = convert_events(config)
@@ -85,28 +85,24 @@ class TestConvertEvents:
         # Verify that read response was stopped
         mock_read_response.stop.assert_called_once()
 
-    @patch('main.eventstore_client')
-    @patch('main.SQLiteEventStore')
-    def test_conversion_with_multiple_events(self, mock_sqlite_store_class, mock_eventstore_client, config, mock_event):
+    def test_events_per_second_with_zero_duration(self, monkeypatch, config, mock_event, mock_sqlite_store, mock_read_response):
+        """Test that a conversion finishing within the clock resolution reports a zero rate."""
+        mock_read_response.__iter__.return_value = iter([mock_event])
+        mock_sqlite_store.get_stats.return_value = _stats(total=1, batches=1)
+        monkeypatch.setattr('main.time', SimpleNamespace(time=lambda: 1640995200.0))
+        
+        stats = convert_events(config)
+        
+        assert stats['conversion_duration_seconds'] == 0
+        assert stats['events_per_second'] == 0
+
+    def test_conversion_with_multiple_events(self, config, mock_event, mock_sqlite_store, mock_read_response):
         """Test conversion with multiple events."""
         # Create multiple events
-        events = [mock_event for _ in range(5)]
-        mock_read_response = Mock()
-        mock_read_response.__iter__ = Mock(return_value=iter(events))
-        mock_client = Mock()
-        mock_client.read_all.return_value = mock_read_response
-        mock_eventstore_client.return_value.__enter__.return_value = mock_client
+        mock_read_response.__iter__.return_value = repeat(mock_event, 5)
         
         # Mock SQLite store
-        mock_store = Mock()
-        mock_sqlite_store_class.return_value.__enter__.return_value = mock_store
-        mock_store.get_stats.return_value = {
-            'total_events': 5,
-            'events_processed_this_session': 5,
-            'batches_processed': 1,
-            'date_range': (1640995200, 1640995200),
-            'database_size_mb': 0.5
-        }
+        mock_sqlite_store.get_stats.return_value = _stats(total=5, batches=1)
         
         # Run conversion
         stats = convert_events(config)
@@ -116,37 +112,22 @@ class TestConvertEvents:
         assert stats['skipped_events'] == 0
         
         # Verify that save_events_batch was called
-        mock_store.save_events_batch.assert_called()
+        mock_sqlite_store.save_events_batch.assert_called()
 
-    @patch('main.eventstore_client')
-    @patch('main.SQLiteEventStore')
-    def test_conversion_with_validation_errors(self, mock_sqlite_store_class, mock_eventstore_client, config, mock_event):
+    def test_conversion_with_validation_errors(self, config, mock_event, mock_sqlite_store, mock_read_response, mock_event_factory):
         """Test conversion with event validation errors."""
         # Create an invalid event that will cause validation error
-        invalid_event = Mock()
-        invalid_event.id = 'invalid-event'
-        invalid_event.type = 'InvalidEvent'
-        invalid_event.stream_name = 'test-stream'
-        invalid_event.recorded_at = datetime(2023, 1, 1, 12, 0, 0)
-        invalid_event.data = b'\xff\xfe\xfd'  # Invalid UTF-8
+        invalid_event = mock_event_factory(
+            id='invalid-event',
+            type='InvalidEvent',
+            data=b'\xff\xfe\xfd',  # Invalid UTF-8
+        )
         
         events = [mock_event, invalid_event, mock_event]
-        mock_read_response = Mock()
-        mock_read_response.__iter__ = Mock(return_value=iter(events))
-        mock_client = Mock()
-        mock_client.read_all.return_value = mock_read_response
-        mock_eventstore_client.return_value.__enter__.return_value = mock_client
+        mock_read_response.__iter__.return_value = iter(events)
         
         # Mock SQLite store
-        mock_store = Mock()
-        mock_sqlite_store_class.return_value.__enter__.return_value = mock_store
-        mock_store.get_stats.return_value = {
-            'total_events': 2,  # Only valid events
-            'events_processed_this_session': 2,
-            'batches_processed': 1,
-            'date_range': (1640995200, 1640995200),
-            'database_size_mb': 0.2
-        }
+        mock_sqlite_store.get_stats.return_value = _stats(total=2, batches=1)  # Only valid events
         
         # Run conversion
         stats = convert_events(config)
@@ -155,59 +136,30 @@ class TestConvertEvents:
         assert stats['total_events'] == 2
         assert stats['skipped_events'] == 1  # One event was skipped
 
-    @patch('main.eventstore_client')
-    @patch('main.SQLiteEventStore')
-    def test_conversion_with_batch_processing(self, mock_sqlite_store_class, mock_eventstore_client, config, mock_event):
+    def test_conversion_with_batch_processing(self, config, mock_event, mock_sqlite_store, mock_read_response):
         """Test conversion with batch processing."""
         # Set small batch size for testing
-        config.batch_size = 2
+        config = replace(config, batch_size=2)
         
         # Create multiple events
-        events = [mock_event for _ in range(5)]
-        mock_read_response = Mock()
-        mock_read_response.__iter__ = Mock(return_value=iter(events))
-        mock_client = Mock()
-        mock_client.read_all.return_value = mock_read_response
-        mock_eventstore_client.return_value.__enter__.return_value = mock_client
+        mock_read_response.__iter__.return_value = repeat(mock_event, 5)
         
         # Mock SQLite store
-        mock_store = Mock()
-        mock_sqlite_store_class.return_value.__enter__.return_value = mock_store
-        mock_store.get_stats.return_value = {
-            'total_events': 5,
-            'events_processed_this_session': 5,
-            'batches_processed': 3,  # 2 + 2 + 1
-            'date_range': (1640995200, 1640995200),
-            'database_size_mb': 0.5
-        }
+        mock_sqlite_store.get_stats.return_value = _stats(total=5, batches=3)  # 2 + 2 + 1
         
         # Run conversion
         stats = convert_events(config)
         
         # Verify that save_events_batch was called multiple times
-        assert mock_store.save_events_batch.call_count >= 2
+        assert mock_sqlite_store.save_events_batch.call_count >= 2
 
-    @patch('main.eventstore_client')
-    @patch('main.SQLiteEventStore')
-    def test_conversion_with_empty_eventstore(self, mock_sqlite_store_class, mock_eventstore_client, config):
+    def test_conversion_with_empty_eventstore(self, config, mock_sqlite_store, mock_read_response):
         """Test conversion with empty EventStore."""
         # Mock empty EventStore
-        mock_read_response = Mock()
-        mock_read_response.__iter__ = Mock(return_value=iter([]))
-        mock_client = Mock()
-        mock_client.read_all.return_value = mock_read_response
-        mock_eventstore_client.return_value.__enter__.return_value = mock_client
+        mock_read_response.__iter__.return_value = iter([])
         
         # Mock SQLite store
-        mock_store = Mock()
-        mock_sqlite_store_class.return_value.__enter__.return_value = mock_store
-        mock_store.get_stats.return_value = {
-            'total_events': 0,
-            'events_processed_this_session': 0,
-            'batches_processed': 0,
-            'date_range': (None, None),
-            'database_size_mb': 0.0
-        }
+        mock_sqlite_store.get_stats.return_value = _stats()
         
         # Run conversion
         stats = convert_events(config)
@@ -217,74 +169,59 @@ class TestConvertEvents:
         assert stats['events_per_second'] == 0
         assert stats['skipped_events'] == 0
 
-    @patch('main.eventstore_client')
-    def test_eventstore_connection_error(self, mock_eventstore_client, config):
+    def test_eventstore_connection_error(self, monkeypatch, config):
         """Test handling of EventStore connection errors."""
         # Mock connection error
-        mock_eventstore_client.side_effect = ConnectionError("Connection failed")
+        monkeypatch.setattr(
+            'main.eventstore_client',
+            Mock(side_effect=ConnectionError("Connection failed"))
+        )
         
         with pytest.raises(ConnectionError):
             convert_events(config)
 
-    @patch('main.eventstore_client')
-    @patch('main.SQLiteEventStore')
-    def test_sqlite_error_handling(self, mock_sqlite_store_class, mock_eventstore_client, config, mock_event):
+    def test_sqlite_error_handling(self, config, mock_event, mock_sqlite_store, mock_read_response):
         """Test handling of SQLite errors."""
         # Mock EventStore client
-        mock_client = Mock()
-        mock_read_response = Mock()
-        mock_read_response.__iter__ = Mock(return_value=iter([mock_event]))
-        mock_client.read_all.return_value = mock_read_response
-        mock_eventstore_client.return_value.__enter__.return_value = mock_client
+        mock_read_response.__iter__.return_value = iter([mock_event])
         
         # Mock SQLite store that raises an error
-        mock_store = Mock()
-        mock_store.save_events_batch.side_effect = Exception("SQLite error")
-        mock_sqlite_store_class.return_value.__enter__.return_value = mock_store
+        mock_sqlite_store.save_events_batch.side_effect = Exception("SQLite error")
         
         with pytest.raises(Exception, match="SQLite error"):
             convert_events(config)
 
-    @patch('main.eventstore_client')
-    @patch('main.SQLiteEventStore')
-    def test_conversion_with_skip_validation(self, mock_sqlite_store_class, mock_eventstore_client, config, mock_event):
+    def test_eventstore_read_error_handling(self, config, mock_event, mock_sqlite_store, mock_read_response):
+        """Test that errors raised while reading EventStore reach the caller."""
+        def failing_read():
+            yield mock_event
+            raise ConnectionError("Stream interrupted")
+        
+        mock_read_response.__iter__.return_value = failing_read()
+        
+        
+        with pytest.raises(ConnectionError, match="Stream interrupted"):
+            convert_events(config)
+        
+        mock_read_response.stop.assert_called_once()
+
+    def test_conversion_with_skip_validation(self, config, mock_event, mock_sqlite_store, mock_read_response, mock_event_factory):
         """Test conversion with validation disabled."""
         # Disable validation
-        config.validate_data = False
+        config = replace(config, validate_data=False)
         
         # Create an event that would normally fail validation
-        invalid_event = Mock()
-        invalid_event.id = 'invalid-event'
-        invalid_event.type = 'InvalidEvent'
-        invalid_event.stream_name = 'test-stream'
-        invalid_event.recorded_at = datetime(2023, 1, 1, 12, 0, 0)
-        invalid_event.data = b'\xff\xfe\xfd'  # Invalid UTF-8
-        # Add metadata attributes to avoid Mock object issues
-        invalid_event.stream_position = 1
-        invalid_event.commit_position = 100
-        invalid_event.prepare_position = 99
-        invalid_event.retry_count = 0
-        invalid_event.link = None
-        invalid_event.content_type = 'application/json'
-        invalid_event.created = datetime(2023, 1, 1, 12, 0, 0)
+        invalid_event = mock_event_factory(
+            id='invalid-event',
+            type='InvalidEvent',
+            data=b'\xff\xfe\xfd',  # Invalid UTF-8
+        )
         
         events = [invalid_event]
-        mock_read_response = Mock()
-        mock_read_response.__iter__ = Mock(return_value=iter(events))
-        mock_client = Mock()
-        mock_client.read_all.return_value = mock_read_response
-        mock_eventstore_client.return_value.__enter__.return_value = mock_client
+        mock_read_response.__iter__.return_value = iter(events)
         
         # Mock SQLite store
-        mock_store = Mock()
-        mock_sqlite_store_class.return_value.__enter__.return_value = mock_store
-        mock_store.get_stats.return_value = {
-            'total_events': 1,
-            'events_processed_this_session': 1,
-            'batches_processed': 1,
-            'date_range': (1640995200, 1640995200),
-            'database_size_mb': 0.1
-        }
+        mock_sqlite_store.get_stats.return_value = _stats(total=1, batches=1)
         
         # Run conversion - should not fail
         stats = convert_events(config)
@@ -293,28 +230,13 @@ class TestConvertEvents:
         assert stats['total_events'] == 1
         assert stats['skipped_events'] == 0  # No events skipped when validation is disabled
 
-    @patch('main.eventstore_client')
-    @patch('main.SQLiteEventStore')
-    def test_conversion_progress_logging(self, mock_sqlite_store_class, mock_eventstore_client, config, mock_event):
+    def test_conversion_progress_logging(self, config, mock_event, mock_sqlite_store, mock_read_response):
         """Test that progress logging occurs during conversion."""
         # Create many events to trigger progress logging
-        events = [mock_event for _ in range(2500)]  # More than 10 * batch_size
-        mock_read_response = Mock()
-        mock_read_response.__iter__ = Mock(return_value=iter(events))
-        mock_client = Mock()
-        mock_client.read_all.return_value = mock_read_response
-        mock_eventstore_client.return_value.__enter__.return_value = mock_client
+        mock_read_response.__iter__.return_value = repeat(mock_event, 2500)
         
         # Mock SQLite store
-        mock_store = Mock()
-        mock_sqlite_store_class.return_value.__enter__.return_value = mock_store
-        mock_store.get_stats.return_value = {
-            'total_events': 2500,
-            'events_processed_this_session': 2500,
-            'batches_processed': 25,
-            'date_range': (1640995200, 1640995200),
-            'database_size_mb': 2.5
-        }
+        mock_sqlite_store.get_stats.return_value = _stats(total=2500, batches=25)
         
         # Run conversion
         stats = convert_events(config)
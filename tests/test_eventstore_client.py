@@ -16,11 +16,6 @@ class TestEventStoreClient:
         mock_client = Mock()
         mock_client_class.return_value = mock_client
         
-        # Mock the read operation to simulate successful connection
-        mock_read_response = Mock()
-        mock_read_response.__iter__ = Mock(return_value=iter([]))
-        mock_client.get_stream.return_value = mock_read_response
-        
         with eventstore_client("esdb://localhost:2113") as client:
             assert client == mock_client
             mock_client_class.assert_called_once_with(uri="esdb://localhost:2113")
@@ -28,39 +23,22 @@ class TestEventStoreClient:
         # Check that client was closed
         mock_client.close.assert_called_once()
 
+    @pytest.mark.parametrize("error,expected,match", [
+        pytest.param(ConnectionError("Connection refused"), ConnectionError,
+                     "Failed to connect to EventStore", id="connection-error"),
+        pytest.param(OSError("Network unreachable"), ConnectionError,
+                     "Failed to connect to EventStore", id="os-error"),
+        pytest.param(ValueError("Invalid URI"), ConnectionError,
+                     "Failed to connect to EventStore", id="value-error"),
+        pytest.param(RuntimeError("Unexpected error"), RuntimeError,
+                     "Unexpected error", id="unexpected-error"),
+    ])
     @patch('main.EventStoreDBClient')
-    def test_connection_error_handling(self, mock_client_class):
-        """Test handling of connection errors."""
-        mock_client_class.side_effect = ConnectionError("Connection refused")
-        
-        with pytest.raises(ConnectionError, match="Failed to connect to EventStore"):
-            with eventstore_client("esdb://localhost:2113"):
-                pass
-
-    @patch('main.EventStoreDBClient')
-    def test_os_error_handling(self, mock_client_class):
-        """Test handling of OS errors."""
-        mock_client_class.side_effect = OSError("Network unreachable")
-        
-        with pytest.raises(ConnectionError, match="Failed to connect to EventStore"):
-            with eventstore_client("esdb://localhost:2113"):
-                pass
-
-    @patch('main.EventStoreDBClient')
-    def test_value_error_handling(self, mock_client_class):
-        """Test handling of value errors."""
-        mock_client_class.side_effect = ValueError("Invalid URI")
+    def test_error_handling(self, mock_client_class, error, expected, match):
+        """Test that client creation errors are wrapped or re-raised."""
+        mock_client_class.side_effect = error
         
-        with pytest.raises(ConnectionError, match="Failed to connect to EventStore"):
-            with eventstore_client("invalid-uri"):
-                pass
-
-    @patch('main.EventStoreDBClient')
-    def test_unexpected_error_handling(self, mock_client_class):
-        """Test handling of unexpected errors."""
-        mock_client_class.side_effect = RuntimeError("Unexpected error")
-        
-        with pytest.raises(RuntimeError, match="Unexpected error"):
+        with pytest.raises(expected, match=match):
             with eventstore_client("esdb://localhost:2113"):
                 pass
 
@@ -70,11 +48,6 @@ class TestEventStoreClient:
         mock_client = Mock()
         mock_client_class.return_value = mock_client
         
-        # Mock the read operation
-        mock_read_response = Mock()
-        mock_read_response.__iter__ = Mock(return_value=iter([]))
-        mock_client.get_stream.return_value = mock_read_response
-        
         # Simulate an exception during context execution
         with pytest.raises(RuntimeError):
             with eventstore_client("esdb://localhost:2113") as client:
@@ -89,11 +62,6 @@ class TestEventStoreClient:
         mock_client = Mock()
         mock_client_class.return_value = mock_client
         
-        # Mock the read operation
-        mock_read_response = Mock()
-        mock_read_response.__iter__ = Mock(return_value=iter([]))
-        mock_client.get_stream.return_value = mock_read_response
-        
         # Simulate an error during client close
         mock_client.close.side_effect = Exception("Close error")
         
@@ -105,39 +73,67 @@ class TestEventStoreClient:
         mock_client.close.assert_called_once()
 
     @patch('main.EventStoreDBClient')
-    def test_connection_test_with_existing_stream(self, mock_client_class):
-        """Test connection test with existing stream."""
+    def test_no_connection_test_by_default(self, mock_client_class):
+        """Test that no round trip is made before yielding the client."""
         mock_client = Mock()
         mock_client_class.return_value = mock_client
         
-        # Mock successful stream read
-        mock_read_response = Mock()
-        mock_read_response.__iter__ = Mock(return_value=iter([Mock()]))
-        mock_client.get_stream.return_value = mock_read_response
-        
         with eventstore_client("esdb://localhost:2113") as client:
             assert client == mock_client
         
+        mock_client.get_stream.assert_not_called()
+        mock_client.read_all.assert_not_called()
         mock_client.close.assert_called_once()
 
     @patch('main.EventStoreDBClient')
-    def test_connection_test_with_stream_error(self, mock_client_class):
-        """Test connection test with stream error (should still work)."""
+    def test_strict_connection_test(self, mock_client_class):
+        """Test that strict mode checks the connection up front."""
         mock_client = Mock()
         mock_client_class.return_value = mock_client
+        mock_client.read_all.return_value = iter([])
         
-        # Mock stream read error (this should not prevent connection)
-        mock_client.get_stream.side_effect = Exception("Stream error")
-        
-        with eventstore_client("esdb://localhost:2113") as client:
+        with eventstore_client("esdb://localhost:2113", strict=True) as client:
             assert client == mock_client
         
+        mock_client.read_all.assert_called_once_with(limit=1, filter_exclude=())
+        mock_client.close.assert_called_once()
+
+    @patch('main.EventStoreDBClient')
+    def test_strict_connection_test_failure(self, mock_client_class):
+        """Test that strict mode turns a failed check into a ConnectionError."""
+        mock_client = Mock()
+        mock_client_class.return_value = mock_client
+        mock_client.read_all.side_effect = Exception("Service unavailable")
+        
+        with pytest.raises(ConnectionError, match="Failed to connect to EventStore"):
+            with eventstore_client("esdb://localhost:2113", strict=True):
+                pass
+        
+        mock_client.close.assert_called_once()
+
+    @patch('main.EventStoreDBClient')
+    def test_strict_connection_test_failure_while_reading(self, mock_client_class):
+        """Test that strict mode also fails when the probe read breaks mid-stream."""
+        mock_client = Mock()
+        mock_client_class.return_value = mock_client
+        # The read call is lazy, errors surface while iterating the response
+        mock_client.read_all.return_value = MagicMock(
+            __iter__=Mock(side_effect=OSError("Connection reset"))
+        )
+        
+        with pytest.raises(ConnectionError, match="connection check failed"):
+            with eventstore_client("esdb://localhost:2113", strict=True):
+                pass
+        
         mock_client.close.assert_called_once()
 
-    def test_invalid_uri_format(self):
+    @patch('main.EventStoreDBClient')
+    def test_invalid_uri_format(self, mock_client_class):
         """Test that invalid URI formats are handled."""
-        # This test would depend on how EventStoreDBClient handles invalid URIs
-        # For now, we'll test with a clearly invalid URI
-        with pytest.raises(Exception):  # Could be various types of errors
+        mock_client_class.side_effect = ValueError("bad uri")
+
+        with pytest.raises(ConnectionError, match="Failed to connect to EventStore"):
             with eventstore_client("not-a-valid-uri"):
                 pass
+
+        mock_client_class.assert_called_once_with(uri="not-a-valid-uri")
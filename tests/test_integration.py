@@ -2,103 +2,144 @@
 Integration tests for the EventStore to SQLite converter. (Generated using Claude.ai)
 """
 
+import json
 import pytest
-import tempfile
 import sqlite3
-from pathlib import Path
-from unittest.mock import Mock, patch, MagicMock
-from datetime import datetime
+from contextlib import contextmanager
+from unittest.mock import Mock, patch
 from main import (
-    ConversionConfig, SQLiteEvent, SQLiteEventStore, 
+    ConversionConfig, SQLiteEventStore, EventStoreDBClient,
     convert_events, eventstore_client
 )
 
 
+pytestmark = pytest.mark.integration
+
+_EXPECTED_COLUMNS = frozenset({
+    'id', 'recorded_at', 'event_type', 'stream_name',
+    'data', 'eventstore_metadata', 'processed_at'
+})
+_EXPECTED_INDEXES = frozenset({
+    'idx_events_recorded_at',
+    'idx_events_type',
+    'idx_events_stream',
+    'idx_events_processed_at'
+})
+_DATA_TEMPLATES = [
+    json.dumps({'index': i, 'message': f'test event {i}'}) for i in range(10)
+]
+
+
+def _fetch_events(conn, ids):
+    """Fetch (event_type, stream_name, data) keyed by event id in one query."""
+    placeholders = ",".join("?" * len(ids))
+    cursor = conn.execute(
+        f"SELECT id, event_type, stream_name, data FROM events WHERE id IN ({placeholders})",
+        ids
+    )
+    # Rows are consumed straight from the cursor, without an intermediate list
+    return {row[0]: row[1:] for row in cursor}
+
+
+class _ReadResponse:
+    """Plain iterable standing in for the EventStore read_all() response."""
+
+    def __init__(self, events):
+        self._events = events
+
+    def __iter__(self):
+        return iter(self._events)
+
+    def stop(self):
+        pass
+
+
+@pytest.fixture(scope="module")
+def sample_events(mock_event_factory):
+    """Create sample EventStore events, shared read-only by the module."""
+    times = [mock_event_factory().recorded_at.replace(minute=i) for i in range(10)]
+    return tuple(
+        mock_event_factory(
+            id=f'event-{i}',
+            type=f'TestEvent{i}',
+            stream_name=f'stream-{i % 3}',
+            recorded_at=times[i],
+            data=_DATA_TEMPLATES[i],
+            stream_position=i,
+            commit_position=100 + i,
+            prepare_position=99 + i,
+            created=times[i],
+        )
+        for i in range(10)
+    )
+
+
 class TestIntegration:
     """Integration test cases."""
 
     @pytest.fixture
-    def temp_db_path(self):
-        """Create a temporary database path for testing."""
-        with tempfile.NamedTemporaryFile(suffix='.db', delete=False) as f:
-            temp_path = Path(f.name)
-        yield temp_path
-        # Cleanup
-        if temp_path.exists():
-            temp_path.unlink()
+    def verify_conn(self, temp_db_path):
+        """Connection used to check the database written by a test."""
+        conn = sqlite3.connect(temp_db_path)
+        yield conn
+        conn.close()
 
     @pytest.fixture
-    def sample_events(self):
-        """Create sample EventStore events for testing."""
-        events = []
-        for i in range(10):
-            event = Mock()
-            event.id = f'event-{i}'
-            event.type = f'TestEvent{i}'
-            event.stream_name = f'stream-{i % 3}'
-            event.recorded_at = datetime(2023, 1, 1, 12, i, 0)
-            event.data = f'{{"index": {i}, "message": "test event {i}"}}'
-            event.stream_position = i
-            event.commit_position = 100 + i
-            event.prepare_position = 99 + i
-            event.retry_count = 0
-            event.link = None
-            event.content_type = 'application/json'
-            event.created = datetime(2023, 1, 1, 12, i, 0)
-            events.append(event)
-        return events
-
-    def test_full_conversion_workflow(self, temp_db_path, sample_events):
+    def patched_esclient(self, monkeypatch):
+        """Client mock yielded by main.eventstore_client for the duration of a test."""
+        mock_client = Mock(spec=EventStoreDBClient)
+
+        @contextmanager
+        def _fake_esc(uri, strict=False):
+            yield mock_client
+
+        monkeypatch.setattr('main.eventstore_client', _fake_esc)
+        return mock_client
+
+    @pytest.mark.parametrize("batch_size,commit_frequency,expected_batches", [
+        (3, 2, 4),  # 3+3+3+1
+        (5, 0, 2),  # 5+5, single commit at the end
+    ])
+    def test_full_conversion_workflow(self, temp_db_path, sample_events, verify_conn, patched_esclient,
+                                      batch_size, commit_frequency, expected_batches):
         """Test the complete conversion workflow from EventStore to SQLite."""
         # Create configuration
         config = ConversionConfig(
             eventstore_uri="esdb://localhost:2113",
             db_path=temp_db_path,
-            batch_size=3,
-            commit_frequency=2
+            batch_size=batch_size,
+            commit_frequency=commit_frequency
         )
 
         # Mock EventStore client
-        mock_client = Mock()
-        mock_read_response = Mock()
-        mock_read_response.__iter__ = Mock(return_value=iter(sample_events))
-        mock_client.read_all.return_value = mock_read_response
-
-        # Mock the eventstore_client context manager
-        with patch('main.eventstore_client') as mock_eventstore_client:
-            mock_eventstore_client.return_value.__enter__.return_value = mock_client
-            
-            # Run conversion
-            stats = convert_events(config)
-            
-            # Verify results
-            assert stats['total_events'] == 10
-            assert stats['skipped_events'] == 0
-            assert stats['events_per_second'] > 0
+        patched_esclient.read_all.return_value = _ReadResponse(sample_events)
 
-        # Verify database was created and contains data
-        assert temp_db_path.exists()
+        # Run conversion
+        stats = convert_events(config)
+
+        # Verify results
+        assert stats['total_events'] == 10
+        assert stats['skipped_events'] == 0
+        assert stats['batches_processed'] == expected_batches
+
+        # Verify database was written (verify_conn creates an empty file)
+        assert temp_db_path.stat().st_size > 0
         
         # Check database contents
-        with sqlite3.connect(temp_db_path) as conn:
-            cursor = conn.execute("SELECT COUNT(*) FROM events")
-            count = cursor.fetchone()[0]
-            assert count == 10
-            
-            # Check a specific event
-            cursor = conn.execute(
-                "SELECT id, event_type, stream_name, data FROM events WHERE id = ?",
-                ('event-5',)
-            )
-            row = cursor.fetchone()
-            assert row is not None
-            assert row[0] == 'event-5'
-            assert row[1] == 'TestEvent5'
-            assert row[2] == 'stream-2'
-            assert 'index": 5' in row[3]
-
-    def test_database_schema_creation(self, temp_db_path):
-        """Test that database schema is properly created."""
+        count = verify_conn.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+        assert count == 10
+
+        # Check specific events
+        rows = _fetch_events(verify_conn, ['event-0', 'event-5', 'event-9'])
+        assert rows.keys() == {'event-0', 'event-5', 'event-9'}
+        event_type, stream_name, data = rows['event-5']
+        assert event_type == 'TestEvent5'
+        assert stream_name == 'stream-2'
+        assert 'index": 5' in data
+        assert rows['event-9'][:2] == ('TestEvent9', 'stream-0')
+
+    def test_database_schema_creation(self, temp_db_path, verify_conn, sqlite_object_exists):
+        """Test that database schema is properly created, with the indexes built on close."""
         config = ConversionConfig(
             eventstore_uri="esdb://localhost:2113",
             db_path=temp_db_path,
@@ -108,117 +149,39 @@ class TestIntegration:
         # Create store and connect
         with SQLiteEventStore(temp_db_path, config) as store:
             # Verify tables exist
-            cursor = store.connection.execute(
-                "SELECT name FROM sqlite_master WHERE type='table'"
-            )
-            table_names = [row[0] for row in cursor.fetchall()]
-            
-            assert 'events' in table_names
-            assert 'conversion_metadata' in table_names
+            assert sqlite_object_exists(store.connection, 'table', 'events')
+            assert sqlite_object_exists(store.connection, 'table', 'conversion_metadata')
             
             # Verify events table structure
             cursor = store.connection.execute("PRAGMA table_info(events)")
-            columns = {row[1] for row in cursor.fetchall()}
-            
-            expected_columns = {
-                'id', 'recorded_at', 'event_type', 'stream_name',
-                'data', 'eventstore_metadata', 'processed_at'
-            }
-            assert expected_columns.issubset(columns)
-            
-            # Verify indexes were created
-            cursor = store.connection.execute(
-                "SELECT name FROM sqlite_master WHERE type='index'"
-            )
-            index_names = [row[0] for row in cursor.fetchall()]
-            
-            expected_indexes = [
-                'idx_events_recorded_at',
-                'idx_events_type',
-                'idx_events_stream',
-                'idx_events_processed_at'
-            ]
-            
-            for expected_index in expected_indexes:
-                assert expected_index in index_names
+            columns = {row[1] for row in cursor}
+            assert _EXPECTED_COLUMNS.issubset(columns)
 
-    def test_batch_processing_and_commits(self, temp_db_path, sample_events):
-        """Test that batch processing and commits work correctly."""
-        config = ConversionConfig(
-            eventstore_uri="esdb://localhost:2113",
-            db_path=temp_db_path,
-            batch_size=3,
-            commit_frequency=2
-        )
-
-        # Mock EventStore client
-        mock_client = Mock()
-        mock_read_response = Mock()
-        mock_read_response.__iter__ = Mock(return_value=iter(sample_events))
-        mock_client.read_all.return_value = mock_read_response
+        # Indexes are deferred until the store is closed
+        for index_name in _EXPECTED_INDEXES:
+            assert sqlite_object_exists(verify_conn, 'index', index_name)
 
-        with patch('main.eventstore_client') as mock_eventstore_client:
-            mock_eventstore_client.return_value.__enter__.return_value = mock_client
-            
-            # Run conversion
-            stats = convert_events(config)
-            
-            # Verify batch processing
-            assert stats['total_events'] == 10
-            # With batch size 3 and 10 events, we should have 4 batches (3+3+3+1)
-            assert stats['batches_processed'] == 4
-
-        # Verify database contents
-        with sqlite3.connect(temp_db_path) as conn:
-            cursor = conn.execute("SELECT COUNT(*) FROM events")
-            count = cursor.fetchone()[0]
-            assert count == 10
-
-    def test_event_validation_and_filtering(self, temp_db_path):
+    def test_event_validation_and_filtering(self, temp_db_path, verify_conn, patched_esclient, mock_event_factory):
         """Test that event validation and filtering works correctly."""
         # Create events with some invalid data
-        valid_event = Mock()
-        valid_event.id = 'valid-event'
-        valid_event.type = 'ValidEvent'
-        valid_event.stream_name = 'test-stream'
-        valid_event.recorded_at = datetime(2023, 1, 1, 12, 0, 0)
-        valid_event.data = '{"valid": "data"}'
-        valid_event.stream_position = 1
-        valid_event.commit_position = 100
-        valid_event.prepare_position = 99
-        valid_event.retry_count = 0
-        valid_event.link = None
-        valid_event.content_type = 'application/json'
-        valid_event.created = datetime(2023, 1, 1, 12, 0, 0)
-
-        invalid_event = Mock()
-        invalid_event.id = 'invalid-event'
-        invalid_event.type = 'InvalidEvent'
-        invalid_event.stream_name = 'test-stream'
-        invalid_event.recorded_at = datetime(2023, 1, 1, 12, 0, 0)
-        invalid_event.data = b'\xff\xfe\xfd'  # Invalid UTF-8
-        invalid_event.stream_position = 2
-        invalid_event.commit_position = 101
-        invalid_event.prepare_position = 100
-        invalid_event.retry_count = 0
-        invalid_event.link = None
-        invalid_event.content_type = 'application/json'
-        invalid_event.created = datetime(2023, 1, 1, 12, 0, 0)
-
+        valid_event = mock_event_factory(id='valid-event', type='ValidEvent', data='{"valid": "data"}')
+        invalid_event = mock_event_factory(
+            id='invalid-event',
+            type='InvalidEvent',
+            data=b'\xff\xfe\xfd',  # Invalid UTF-8
+            stream_position=2,
+            commit_position=101,
+            prepare_position=100,
+        )
         # Create a second valid event with different ID
-        valid_event2 = Mock()
-        valid_event2.id = 'valid-event-2'
-        valid_event2.type = 'ValidEvent'
-        valid_event2.stream_name = 'test-stream'
-        valid_event2.recorded_at = datetime(2023, 1, 1, 12, 0, 0)
-        valid_event2.data = '{"valid": "data2"}'
-        valid_event2.stream_position = 3
-        valid_event2.commit_position = 102
-        valid_event2.prepare_position = 101
-        valid_event2.retry_count = 0
-        valid_event2.link = None
-        valid_event2.content_type = 'application/json'
-        valid_event2.created = datetime(2023, 1, 1, 12, 0, 0)
+        valid_event2 = mock_event_factory(
+            id='valid-event-2',
+            type='ValidEvent',
+            data='{"valid": "data2"}',
+            stream_position=3,
+            commit_position=102,
+            prepare_position=101,
+        )
         
         events = [valid_event, invalid_event, valid_event2]
         
@@ -230,38 +193,26 @@ class TestIntegration:
         )
 
         # Mock EventStore client
-        mock_client = Mock()
-        mock_read_response = Mock()
-        mock_read_response.__iter__ = Mock(return_value=iter(events))
-        mock_client.read_all.return_value = mock_read_response
+        patched_esclient.read_all.return_value = _ReadResponse(events)
 
-        with patch('main.eventstore_client') as mock_eventstore_client:
-            mock_eventstore_client.return_value.__enter__.return_value = mock_client
-            
-            # Run conversion
-            stats = convert_events(config)
-            
-            # Verify that invalid event was skipped
-            # Note: The total_events count comes from the database, not the session
-            assert stats['events_processed_this_session'] == 2
-            assert stats['skipped_events'] == 1
+        # Run conversion
+        stats = convert_events(config)
+
+        # Verify that invalid event was skipped
+        # Note: The total_events count comes from the database, not the session
+        assert stats['events_processed_this_session'] == 2
+        assert stats['skipped_events'] == 1
 
         # Verify only valid events are in database
-        with sqlite3.connect(temp_db_path) as conn:
-            cursor = conn.execute("SELECT COUNT(*) FROM events")
-            count = cursor.fetchone()[0]
-            # We expect 2 valid events (the same valid event appears twice in the test)
-            assert count == 2
-            
-            # Verify invalid event is not present
-            cursor = conn.execute(
-                "SELECT COUNT(*) FROM events WHERE id = ?",
-                ('invalid-event',)
-            )
-            count = cursor.fetchone()[0]
-            assert count == 0
-
-    def test_conversion_metadata_tracking(self, temp_db_path, sample_events):
+        count = verify_conn.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+        # We expect 2 valid events (the same valid event appears twice in the test)
+        assert count == 2
+
+        # Verify invalid event is not present
+        rows = _fetch_events(verify_conn, ['valid-event', 'invalid-event', 'valid-event-2'])
+        assert rows.keys() == {'valid-event', 'valid-event-2'}
+
+    def test_conversion_metadata_tracking(self, temp_db_path, sample_events, verify_conn, patched_esclient):
         """Test that conversion metadata is properly tracked."""
         config = ConversionConfig(
             eventstore_uri="esdb://localhost:2113",
@@ -270,27 +221,19 @@ class TestIntegration:
         )
 
         # Mock EventStore client
-        mock_client = Mock()
-        mock_read_response = Mock()
-        mock_read_response.__iter__ = Mock(return_value=iter(sample_events))
-        mock_client.read_all.return_value = mock_read_response
+        patched_esclient.read_all.return_value = _ReadResponse(sample_events)
 
-        with patch('main.eventstore_client') as mock_eventstore_client:
-            mock_eventstore_client.return_value.__enter__.return_value = mock_client
-            
-            # Run conversion
-            stats = convert_events(config)
+        # Run conversion
+        stats = convert_events(config)
 
         # Verify metadata was recorded
-        with sqlite3.connect(temp_db_path) as conn:
-            cursor = conn.execute(
-                "SELECT key, value FROM conversion_metadata"
-            )
-            metadata = dict(cursor.fetchall())
-            
-            assert 'last_conversion' in metadata
-            assert 'total_events' in metadata
-            assert int(metadata['total_events']) == 10
+        metadata = dict(verify_conn.execute(
+            "SELECT key, value FROM conversion_metadata"
+        ))
+
+        assert 'last_conversion' in metadata
+        assert 'total_events' in metadata
+        assert int(metadata['total_events']) == 10
 
     def test_performance_optimization_settings(self, temp_db_path):
         """Test that SQLite performance optimizations are applied."""
@@ -300,21 +243,21 @@ class TestIntegration:
         )
 
         with SQLiteEventStore(temp_db_path, config) as store:
-            # Verify PRAGMA settings
-            cursor = store.connection.execute("PRAGMA journal_mode")
-            journal_mode = cursor.fetchone()[0]
-            assert journal_mode == "wal"
+            # Verify PRAGMA settings, read in a single statement
+            journal_mode, synchronous, cache_size, page_size, temp_store = store.connection.execute(
+                """
+                SELECT (SELECT journal_mode FROM pragma_journal_mode),
+                       (SELECT synchronous FROM pragma_synchronous),
+                       (SELECT cache_size FROM pragma_cache_size),
+                       (SELECT page_size FROM pragma_page_size),
+                       (SELECT temp_store FROM pragma_temp_store)
+                """
+            ).fetchone()
             
-            cursor = store.connection.execute("PRAGMA synchronous")
-            synchronous = cursor.fetchone()[0]
+            assert journal_mode == "wal"
             assert synchronous == 1  # NORMAL
-            
-            cursor = store.connection.execute("PRAGMA cache_size")
-            cache_size = cursor.fetchone()[0]
-            assert cache_size == 10000
-            
-            cursor = store.connection.execute("PRAGMA temp_store")
-            temp_store = cursor.fetchone()[0]
+            assert cache_size == -131072  # 128MB
+            assert page_size == 8192
             assert temp_store == 2  # MEMORY
 
     def test_error_handling_and_recovery(self, temp_db_path):
@@ -325,29 +268,12 @@ class TestIntegration:
             batch_size=2
         )
 
-        # Test with invalid database path
-        # Use a path that can't be created due to permissions, not filesystem structure
-        import tempfile
-        temp_dir = tempfile.mkdtemp()
-        try:
-            # Make the temp directory read-only
-            import os
-            os.chmod(temp_dir, 0o444)  # Read-only
-            
-            invalid_config = ConversionConfig(
-                eventstore_uri="esdb://localhost:2113",
-                db_path=Path(temp_dir) / "test.db"
-            )
-
-            # Should raise an error when trying to connect
-            with pytest.raises((sqlite3.Error, OSError)):
-                with SQLiteEventStore(invalid_config.db_path, invalid_config):
+        # Database that cannot be opened
+        with patch('main.sqlite3.connect',
+                   side_effect=sqlite3.OperationalError("unable to open database file")):
+            with pytest.raises(sqlite3.Error):
+                with SQLiteEventStore(temp_db_path, config):
                     pass
-        finally:
-            # Restore permissions and cleanup
-            os.chmod(temp_dir, 0o755)
-            import shutil
-            shutil.rmtree(temp_dir)
 
         # Valid path should work
         with SQLiteEventStore(temp_db_path, config) as store:
@@ -2,35 +2,58 @@
 Tests for main function and command line interface. (Generated using Claude.ai)
 """
 
+import logging
 import pytest
+import re
 import sys
-import os
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import Mock, patch
 from pathlib import Path
-from main import main, ConversionConfig
+from types import SimpleNamespace
+from main import main, _add_file_logging
+
+
+# Summary printed by test_main_output_formatting, line by line
+_EXPECTED_SUMMARY = re.compile(
+    r"^CONVERSION COMPLETED SUCCESSFULLY\n=+\n"
+    r"Database file: test\.db\n"
+    r"Total events: 5,000\n"
+    r"Duration: 25\.00 seconds\n"
+    r"Rate: 200\.0 events/second\n"
+    r"Database size: 10\.50 MB\n"
+    r"Skipped events: 5$",
+    re.MULTILINE
+)
 
 
 class TestMain:
     """Test cases for main function."""
 
+    @pytest.fixture
+    def main_runner(self, monkeypatch):
+        """Run main() with the given argv and a mocked sys.exit, which is returned."""
+        exit_mock = Mock()
+        monkeypatch.setattr(sys, 'exit', exit_mock)
+        # Keep the log file out of the working directory
+        monkeypatch.setattr('main._add_file_logging', Mock())
+
+        def _run(argv):
+            monkeypatch.setattr(sys, 'argv', argv)
+            main()
+            return exit_mock
+
+        return _run
+
     @pytest.fixture
     def mock_argv(self):
         """Create mock command line arguments."""
         return ['main.py', '--db', 'test.db']
 
-    @pytest.fixture
-    def mock_env(self):
-        """Create mock environment variables."""
-        return {'EVENTSTORE_URI': 'esdb://localhost:2113'}
-
     @patch('main.create_config_from_args')
     @patch('main.convert_events')
-    @patch.dict(os.environ, {'EVENTSTORE_URI': 'esdb://localhost:2113'})
-    def test_successful_main_execution(self, mock_convert_events, mock_create_config, mock_argv):
+    def test_successful_main_execution(self, mock_convert_events, mock_create_config, mock_argv, main_runner):
         """Test successful main function execution."""
         # Mock configuration
-        mock_config = Mock(spec=ConversionConfig)
-        mock_config.db_path = Path("test.db")
+        mock_config = SimpleNamespace(db_path=Path("test.db"))
         mock_create_config.return_value = mock_config
         
         # Mock conversion results
@@ -42,86 +65,39 @@ class TestMain:
             'skipped_events': 0
         }
         
-        # Mock sys.argv
-        with patch.object(sys, 'argv', mock_argv):
-            # Mock sys.exit to prevent actual exit
-            with patch.object(sys, 'exit') as mock_exit:
-                main()
-                
-                # Verify that conversion was called
-                mock_convert_events.assert_called_once_with(mock_config)
-                
-                # Verify that exit was called with success code
-                mock_exit.assert_called_once_with(0)
+        mock_exit = main_runner(mock_argv)
 
-    @patch('main.create_config_from_args')
-    @patch.dict(os.environ, {'EVENTSTORE_URI': 'esdb://localhost:2113'})
-    def test_main_with_configuration_error(self, mock_create_config, mock_argv):
-        """Test main function with configuration error."""
-        # Mock configuration error
-        mock_create_config.side_effect = ValueError("Invalid configuration")
-        
-        # Mock sys.argv
-        with patch.object(sys, 'argv', mock_argv):
-            # Mock sys.exit to prevent actual exit
-            with patch.object(sys, 'exit') as mock_exit:
-                main()
-                
-                # Verify that exit was called with error code
-                mock_exit.assert_called_once_with(1)
+        # Verify that conversion was called
+        mock_convert_events.assert_called_once_with(mock_config)
 
-    @patch('main.create_config_from_args')
-    @patch('main.convert_events')
-    @patch.dict(os.environ, {'EVENTSTORE_URI': 'esdb://localhost:2113'})
-    def test_main_with_conversion_error(self, mock_convert_events, mock_create_config, mock_argv):
-        """Test main function with conversion error."""
-        # Mock configuration
-        mock_config = Mock(spec=ConversionConfig)
-        mock_config.db_path = Path("test.db")
-        mock_create_config.return_value = mock_config
-        
-        # Mock conversion error
-        mock_convert_events.side_effect = Exception("Conversion failed")
-        
-        # Mock sys.argv
-        with patch.object(sys, 'argv', mock_argv):
-            # Mock sys.exit to prevent actual exit
-            with patch.object(sys, 'exit') as mock_exit:
-                main()
-                
-                # Verify that exit was called with error code
-                mock_exit.assert_called_once_with(1)
+        # Verify that exit was called with success code
+        mock_exit.assert_called_once_with(0)
 
-    @patch('main.create_config_from_args')
-    @patch('main.convert_events')
-    @patch.dict(os.environ, {'EVENTSTORE_URI': 'esdb://localhost:2113'})
-    def test_main_with_keyboard_interrupt(self, mock_convert_events, mock_create_config, mock_argv):
-        """Test main function with keyboard interrupt."""
-        # Mock configuration
-        mock_config = Mock(spec=ConversionConfig)
-        mock_config.db_path = Path("test.db")
-        mock_create_config.return_value = mock_config
+    @pytest.mark.parametrize("target,error,output", [
+        pytest.param('main.create_config_from_args', ValueError("Invalid configuration"),
+                     "Error: Invalid configuration", id="configuration-error"),
+        pytest.param('main.convert_events', Exception("Conversion failed"),
+                     "Error: Conversion failed", id="conversion-error"),
+        pytest.param('main.convert_events', KeyboardInterrupt(),
+                     "Conversion interrupted by user", id="keyboard-interrupt"),
+    ])
+    def test_main_error_paths(self, monkeypatch, mock_argv, main_runner, capsys, target, error, output):
+        """Test that failures print an error message and exit with code 1."""
+        monkeypatch.setattr('main.create_config_from_args',
+                            Mock(return_value=SimpleNamespace(db_path=Path("test.db"))))
+        monkeypatch.setattr(target, Mock(side_effect=error))
         
-        # Mock keyboard interrupt
-        mock_convert_events.side_effect = KeyboardInterrupt()
+        mock_exit = main_runner(mock_argv)
         
-        # Mock sys.argv
-        with patch.object(sys, 'argv', mock_argv):
-            # Mock sys.exit to prevent actual exit
-            with patch.object(sys, 'exit') as mock_exit:
-                main()
-                
-                # Verify that exit was called with interrupt code
-                mock_exit.assert_called_once_with(1)
+        mock_exit.assert_called_once_with(1)
+        assert output in capsys.readouterr().out
 
     @patch('main.create_config_from_args')
     @patch('main.convert_events')
-    @patch.dict(os.environ, {'EVENTSTORE_URI': 'esdb://localhost:2113'})
-    def test_main_output_formatting(self, mock_convert_events, mock_create_config, mock_argv, capsys):
+    def test_main_output_formatting(self, mock_convert_events, mock_create_config, mock_argv, main_runner, capsys):
         """Test main function output formatting."""
         # Mock configuration
-        mock_config = Mock(spec=ConversionConfig)
-        mock_config.db_path = Path("test.db")
+        mock_config = SimpleNamespace(db_path=Path("test.db"))
         mock_create_config.return_value = mock_config
         
         # Mock conversion results
@@ -133,32 +109,20 @@ class TestMain:
             'skipped_events': 5
         }
         
-        # Mock sys.argv
-        with patch.object(sys, 'argv', mock_argv):
-            # Mock sys.exit to prevent actual exit
-            with patch.object(sys, 'exit'):
-                main()
-                
-                # Capture output
-                captured = capsys.readouterr()
-                
-                # Verify output contains expected information
-                assert "CONVERSION COMPLETED SUCCESSFULLY" in captured.out
-                assert "Database file: test.db" in captured.out
-                assert "Total events: 5,000" in captured.out
-                assert "Duration: 25.00 seconds" in captured.out
-                assert "Rate: 200.0 events/second" in captured.out
-                assert "Database size: 10.50 MB" in captured.out
-                assert "Skipped events: 5" in captured.out
+        main_runner(mock_argv)
+
+        # Capture output
+        captured = capsys.readouterr()
+
+        # Verify output contains expected information
+        assert _EXPECTED_SUMMARY.search(captured.out), captured.out
 
     @patch('main.create_config_from_args')
     @patch('main.convert_events')
-    @patch.dict(os.environ, {'EVENTSTORE_URI': 'esdb://localhost:2113'})
-    def test_main_output_without_skipped_events(self, mock_convert_events, mock_create_config, mock_argv, capsys):
+    def test_main_output_without_skipped_events(self, mock_convert_events, mock_create_config, mock_argv, main_runner, capsys):
         """Test main function output when no events are skipped."""
         # Mock configuration
-        mock_config = Mock(spec=ConversionConfig)
-        mock_config.db_path = Path("test.db")
+        mock_config = SimpleNamespace(db_path=Path("test.db"))
         mock_create_config.return_value = mock_config
         
         # Mock conversion results with no skipped events
@@ -170,26 +134,20 @@ class TestMain:
             'skipped_events': 0
         }
         
-        # Mock sys.argv
-        with patch.object(sys, 'argv', mock_argv):
-            # Mock sys.exit to prevent actual exit
-            with patch.object(sys, 'exit'):
-                main()
-                
-                # Capture output
-                captured = capsys.readouterr()
-                
-                # Verify output doesn't contain skipped events line
-                assert "Skipped events:" not in captured.out
+        main_runner(mock_argv)
+
+        # Capture output
+        captured = capsys.readouterr()
+
+        # Verify output doesn't contain skipped events line
+        assert "Skipped events:" not in captured.out
 
     @patch('main.create_config_from_args')
     @patch('main.convert_events')
-    @patch.dict(os.environ, {'EVENTSTORE_URI': 'esdb://localhost:2113'})
-    def test_main_with_custom_arguments(self, mock_convert_events, mock_create_config, mock_argv):
+    def test_main_with_custom_arguments(self, mock_convert_events, mock_create_config, mock_argv, main_runner):
         """Test main function with custom command line arguments."""
         # Mock configuration
-        mock_config = Mock(spec=ConversionConfig)
-        mock_config.db_path = Path("custom.db")
+        mock_config = SimpleNamespace(db_path=Path("custom.db"))
         mock_create_config.return_value = mock_config
         
         # Mock conversion results
@@ -203,54 +161,51 @@ class TestMain:
         
         # Mock sys.argv with custom arguments
         custom_argv = ['main.py', '--db', 'custom.db', '--batch-size', '500']
-        with patch.object(sys, 'argv', custom_argv):
-            # Mock sys.exit to prevent actual exit
-            with patch.object(sys, 'exit') as mock_exit:
-                main()
-                
-                # Verify that configuration was created with custom arguments
-                mock_create_config.assert_called_once()
-                
-                # Verify that exit was called with success code
-                mock_exit.assert_called_once_with(0)
+        mock_exit = main_runner(custom_argv)
+
+        # Verify that configuration was created with custom arguments
+        mock_create_config.assert_called_once()
+
+        # Verify that exit was called with success code
+        mock_exit.assert_called_once_with(0)
 
     @patch('main.create_config_from_args')
     @patch('main.convert_events')
-    @patch.dict(os.environ, {'EVENTSTORE_URI': 'esdb://localhost:2113'})
-    def test_main_with_version_argument(self, mock_convert_events, mock_create_config, mock_argv):
+    def test_main_with_version_argument(self, mock_convert_events, mock_create_config, mock_argv, main_runner):
         """Test main function with version argument."""
         # Mock sys.argv with version argument
         version_argv = ['main.py', '--version']
-        with patch.object(sys, 'argv', version_argv):
-            # Mock sys.exit to prevent actual exit
-            with patch.object(sys, 'exit') as mock_exit:
-                # This should exit early due to version argument
-                main()
-                
-                # Verify that exit was called (version argument causes early exit)
-                mock_exit.assert_called()
+        # This should exit early due to version argument
+        mock_exit = main_runner(version_argv)
 
-    @patch('main.create_config_from_args')
+        # Verify that exit was called (version argument causes early exit)
+        mock_exit.assert_called()
+
+    @pytest.mark.parametrize("option", ["--force", "--unsafe-fast-import"])
     @patch('main.convert_events')
-    @patch.dict(os.environ, {'EVENTSTORE_URI': 'esdb://localhost:2113'})
-    def test_main_error_output(self, mock_convert_events, mock_create_config, mock_argv, capsys):
-        """Test main function error output."""
-        # Mock configuration
-        mock_config = Mock(spec=ConversionConfig)
-        mock_config.db_path = Path("test.db")
-        mock_create_config.return_value = mock_config
+    def test_sqlite_only_options_rejected_for_parquet(self, mock_convert_events, monkeypatch, capsys, option):
+        """Test that SQLite-only options are rejected instead of ignored for Parquet output."""
+        monkeypatch.setattr(sys, 'argv', ['main.py', '--db', 'events.parquet', '--format', 'parquet', option])
+        
+        with pytest.raises(SystemExit) as exc_info:
+            main()
+        
+        assert exc_info.value.code == 2
+        assert f"{option} only applies to --format sqlite" in capsys.readouterr().err
+        mock_convert_events.assert_not_called()
+
+    def test_file_logging(self, tmp_path):
+        """Test that the log file handler flushes as soon as an error is logged."""
+        root = logging.getLogger()
+        handlers = list(root.handlers)
+        log_file = tmp_path / "converter.log"
         
-        # Mock conversion error
-        mock_convert_events.side_effect = Exception("Test error message")
+        try:
+            _add_file_logging(str(log_file))
+            logging.getLogger("main").error("conversion failed")
+        finally:
+            for handler in set(root.handlers) - set(handlers):
+                root.removeHandler(handler)
+                handler.close()
         
-        # Mock sys.argv
-        with patch.object(sys, 'argv', mock_argv):
-            # Mock sys.exit to prevent actual exit
-            with patch.object(sys, 'exit'):
-                main()
-                
-                # Capture output
-                captured = capsys.readouterr()
-                
-                # Verify error output
-                assert "Error: Test error message" in captured.out
+        assert "ERROR - conversion failed" in log_file.read_text()
@@ -0,0 +1,78 @@
+"""
+Tests for ParquetEventStore class.
+"""
+
+import pytest
+import uuid
+from main import ParquetEventStore, ConversionConfig, event_to_row
+
+pq = pytest.importorskip("pyarrow.parquet")
+
+
+class TestParquetEventStore:
+    """Test cases for ParquetEventStore class."""
+
+    @pytest.fixture
+    def parquet_path(self, tmp_path):
+        """Path of the Parquet output file."""
+        return tmp_path / "events.parquet"
+
+    @pytest.fixture
+    def config(self, parquet_path):
+        """Create a Parquet output configuration."""
+        return ConversionConfig(
+            eventstore_uri="esdb://localhost:2113",
+            db_path=parquet_path,
+            output_format="parquet"
+        )
+
+    def make_rows(self, mock_event, count):
+        """Helper to build event rows with unique UUID IDs."""
+        row = event_to_row(mock_event)
+        return [(uuid.uuid4().bytes,) + row[1:] for _ in range(count)]
+
+    def test_save_events_batch(self, parquet_path, config, mock_event):
+        """Test that batches are written as rows of the Parquet file."""
+        with ParquetEventStore(parquet_path, config) as store:
+            store.save_events_batch(self.make_rows(mock_event, 3))
+            store.save_events_batch(self.make_rows(mock_event, 2))
+            stats = store.get_stats()
+
+        assert stats['total_events'] == 5
+        assert stats['batches_processed'] == 2
+
+        table = pq.read_table(parquet_path)
+        assert table.num_rows == 5
+        assert table.column_names == [
+            'id', 'recorded_at', 'event_type', 'stream_name',
+            'data', 'eventstore_metadata', 'processed_at'
+        ]
+        first = table.slice(0, 1).to_pylist()[0]
+        assert len(first['id']) == 16
+        assert first['event_type'] == 'TestEvent'
+        assert first['data'] == b'{"test": "data"}'
+        assert first['processed_at'] > 0
+
+    def test_raw_bytes_data(self, parquet_path, config, mock_event):
+        """Test that raw event bytes are stored untouched."""
+        mock_event.data = b'\x00\x01binary'
+        rows = [event_to_row(mock_event, validate=False)]
+
+        with ParquetEventStore(parquet_path, config) as store:
+            store.save_events_batch(rows)
+
+        assert pq.read_table(parquet_path).column('data').to_pylist() == [b'\x00\x01binary']
+
+    def test_database_size_set_on_close(self, parquet_path, config, mock_event):
+        """Test that the file size is measured when the store is closed."""
+        store = ParquetEventStore(parquet_path, config)
+        store.connect()
+        store.save_events_batch(self.make_rows(mock_event, 1))
+        store.close()
+
+        assert store.database_size_mb == parquet_path.stat().st_size / (1024 * 1024)
+
+    def test_get_stats_without_writer(self, parquet_path, config):
+        """Test getting stats before the file is opened."""
+        store = ParquetEventStore(parquet_path, config)
+        assert store.get_stats() == {}
@@ -1,182 +1,143 @@
 """
-Tests for SQLiteEvent class. (Generated using Claude.ai)
+Tests for event_to_row function. (Generated using Claude.ai)
 """
 
 import pytest
-import json
-from unittest.mock import Mock, MagicMock
-from datetime import datetime
-from main import SQLiteEvent, EventValidationError
-
-
-class TestSQLiteEvent:
-    """Test cases for SQLiteEvent class."""
-
-    def create_mock_event(self, **kwargs):
-        """Helper to create a mock EventStore event."""
-        mock_event = Mock()
-        mock_event.id = kwargs.get('id', 'test-event-id')
-        mock_event.type = kwargs.get('type', 'TestEvent')
-        mock_event.stream_name = kwargs.get('stream_name', 'test-stream')
-        mock_event.recorded_at = kwargs.get('recorded_at', datetime(2023, 1, 1, 12, 0, 0))
-        mock_event.data = kwargs.get('data', '{"test": "data"}')
-        mock_event.stream_position = kwargs.get('stream_position', 1)
-        mock_event.commit_position = kwargs.get('commit_position', 100)
-        mock_event.prepare_position = kwargs.get('prepare_position', 99)
-        mock_event.retry_count = kwargs.get('retry_count', 0)
-        mock_event.link = kwargs.get('link', None)
-        mock_event.content_type = kwargs.get('content_type', 'application/json')
-        mock_event.created = kwargs.get('created', datetime(2023, 1, 1, 12, 0, 0))
-        return mock_event
-
-    def test_valid_event_creation(self):
-        """Test creating a valid SQLite event."""
-        mock_event = self.create_mock_event()
-        sqlite_event = SQLiteEvent(mock_event)
-        
-        assert sqlite_event.id == 'test-event-id'
-        assert sqlite_event.type == 'TestEvent'
-        assert sqlite_event.stream_name == 'test-stream'
-        assert sqlite_event.recorded_at == int(datetime(2023, 1, 1, 12, 0, 0).timestamp())
-        assert sqlite_event.data == '{"test": "data"}'
-        assert 'stream_position' in sqlite_event.eventstore_metadata
-
-    def test_event_with_none_data(self):
-        """Test event with None data."""
-        mock_event = self.create_mock_event(data=None)
-        sqlite_event = SQLiteEvent(mock_event)
-        
-        assert sqlite_event.data is None
-
-    def test_event_with_bytes_data(self):
-        """Test event with bytes data."""
-        mock_event = self.create_mock_event(data=b'{"test": "bytes"}')
-        sqlite_event = SQLiteEvent(mock_event)
-        
-        assert sqlite_event.data == '{"test": "bytes"}'
-
-    def test_event_with_dict_data(self):
-        """Test event with dictionary data."""
-        data_dict = {"key": "value", "number": 42}
-        mock_event = self.create_mock_event(data=data_dict)
-        sqlite_event = SQLiteEvent(mock_event)
-        
-        assert json.loads(sqlite_event.data) == data_dict
-
-    def test_event_with_list_data(self):
-        """Test event with list data."""
-        data_list = [1, 2, 3, "test"]
-        mock_event = self.create_mock_event(data=data_list)
-        sqlite_event = SQLiteEvent(mock_event)
-        
-        assert json.loads(sqlite_event.data) == data_list
-
-    def test_event_with_invalid_utf8_bytes_raises_error(self):
-        """Test that invalid UTF-8 bytes raise EventValidationError."""
-        invalid_bytes = b'\xff\xfe\xfd'
-        mock_event = self.create_mock_event(data=invalid_bytes)
-        
-        with pytest.raises(EventValidationError, match="Invalid UTF-8 data"):
-            SQLiteEvent(mock_event, validate=True)
-
-    def test_event_with_invalid_utf8_bytes_skipped_when_no_validation(self):
-        """Test that invalid UTF-8 bytes are skipped when validation is disabled."""
-        invalid_bytes = b'\xff\xfe\xfd'
-        mock_event = self.create_mock_event(data=invalid_bytes)
-        
-        sqlite_event = SQLiteEvent(mock_event, validate=False)
-        assert sqlite_event.data is None
-
-    def test_event_with_non_serializable_data_raises_error(self):
-        """Test that non-serializable data raises EventValidationError."""
-        # Create an object that can't be serialized to JSON
-        class NonSerializable:
-            pass
-        
-        mock_event = self.create_mock_event(data=NonSerializable())
-        
-        with pytest.raises(EventValidationError, match="Cannot serialize data"):
-            SQLiteEvent(mock_event, validate=True)
-
-    def test_event_with_non_serializable_data_skipped_when_no_validation(self):
-        """Test that non-serializable data is skipped when validation is disabled."""
-        class NonSerializable:
-            pass
-        
-        mock_event = self.create_mock_event(data=NonSerializable())
-        
-        sqlite_event = SQLiteEvent(mock_event, validate=False)
-        assert sqlite_event.data is None
-
-    def test_event_data_size_limit(self):
-        """Test that event data size limit is enforced."""
-        large_data = "x" * (SQLiteEvent.MAX_DATA_SIZE + 1)
-        mock_event = self.create_mock_event(data=large_data)
-        
-        with pytest.raises(EventValidationError, match="Event data too large"):
-            SQLiteEvent(mock_event, validate=True)
-
-    def test_event_data_size_limit_bypassed_when_no_validation(self):
-        """Test that data size limit is bypassed when validation is disabled."""
-        large_data = "x" * (SQLiteEvent.MAX_DATA_SIZE + 1)
-        mock_event = self.create_mock_event(data=large_data)
-        
-        sqlite_event = SQLiteEvent(mock_event, validate=False)
-        assert sqlite_event.data == large_data
-
-    def test_event_with_missing_attributes(self):
+import uuid
+from json import loads as _json_loads
+from datetime import datetime, timedelta, timezone
+from main import event_to_row, EventValidationError, MAX_DATA_SIZE
+
+
+# Column positions in the rows returned by event_to_row
+ID, RECORDED_AT, TYPE, STREAM_NAME, DATA, METADATA = range(6)
+
+# Marks metadata keys that must be absent
+_MISSING = object()
+
+# Oversized payloads, built once. Bytes are rejected on their length before
+# decoding, so zero-filled bytes (allocated without being written) will do.
+_LARGE_DATA = "x" * (MAX_DATA_SIZE + 1)
+_LARGE_BYTES = bytes(MAX_DATA_SIZE + 1)
+
+
+class _NonSerializable:
+    """Event data that cannot be serialized to JSON."""
+
+
+@pytest.fixture(scope="module")
+def default_row(default_mock_event):
+    """Row converted from the default fake event, shared read-only by the module."""
+    return event_to_row(default_mock_event)
+
+
+class TestEventToRow:
+    """Test cases for event_to_row function."""
+
+    def test_valid_event_creation(self, default_row, default_mock_event):
+        """Test converting a valid event to a row."""
+        row = default_row
+        
+        assert row[ID] == 'test-event-id'
+        assert row[TYPE] == 'TestEvent'
+        assert row[STREAM_NAME] == 'test-stream'
+        assert row[RECORDED_AT] == int(default_mock_event.recorded_at.timestamp())
+        assert row[DATA] == '{"test": "data"}'
+        assert 'stream_position' in row[METADATA]
+
+    def test_uuid_id_stored_as_bytes(self, mock_event_factory):
+        """Test that UUID event ids are converted to their 16 raw bytes."""
+        event_id = uuid.UUID('0f8fad5b-d9cb-469f-a165-70867728950e')
+        mock_event = mock_event_factory(id=event_id)
+        row = event_to_row(mock_event)
+        
+        assert row[ID] == event_id.bytes
+        assert len(row[ID]) == 16
+
+    def test_timezone_aware_timestamps(self, mock_event_factory):
+        """Test that timezone-aware datetimes are converted to Unix seconds."""
+        recorded_at = datetime(2023, 1, 1, 12, 0, 0, tzinfo=timezone.utc)
+        created = datetime(2023, 1, 1, 13, 0, 0, tzinfo=timezone(timedelta(hours=1)))
+        mock_event = mock_event_factory(recorded_at=recorded_at, created=created)
+        row = event_to_row(mock_event)
+        
+        assert row[RECORDED_AT] == 1672574400
+        assert _json_loads(row[METADATA])['created'] == 1672574400
+
+    @pytest.mark.parametrize("data,expected", [
+        pytest.param(None, None, id="none"),
+        pytest.param(b'{"test": "bytes"}', '{"test": "bytes"}', id="bytes"),
+    ])
+    def test_event_data_stored(self, mock_event_factory, data, expected):
+        """Test that None and bytes data are stored as is or decoded."""
+        row = event_to_row(mock_event_factory(data=data))
+        
+        assert row[DATA] == expected
+
+    @pytest.mark.parametrize("data,expected", [
+        pytest.param({"key": "value", "number": 42}, {"key": "value", "number": 42}, id="dict"),
+        pytest.param({1: "one"}, {"1": "one"}, id="non-string-keys"),
+        pytest.param([1, 2, 3, "test"], [1, 2, 3, "test"], id="list"),
+    ])
+    def test_event_data_serialized(self, mock_event_factory, data, expected):
+        """Test that structured data is serialized to JSON."""
+        row = event_to_row(mock_event_factory(data=data))
+        
+        assert _json_loads(row[DATA]) == expected
+
+    @pytest.mark.parametrize("data,match", [
+        pytest.param(b'\xff\xfe\xfd', "Invalid UTF-8 data", id="invalid-utf8"),
+        pytest.param(_NonSerializable(), "Cannot serialize data", id="non-serializable"),
+        pytest.param(_LARGE_DATA, "Event data too large", id="too-large"),
+        pytest.param(_LARGE_BYTES, "Event data too large", id="too-large-bytes"),
+        # Fewer characters than the limit, but two bytes each once encoded
+        pytest.param("\u00e9" * (MAX_DATA_SIZE // 2 + 1), "Event data too large", id="too-large-multibyte"),
+    ])
+    def test_invalid_event_data_raises_error(self, mock_event_factory, data, match):
+        """Test that invalid data raises EventValidationError when validating."""
+        with pytest.raises(EventValidationError, match=match):
+            event_to_row(mock_event_factory(data=data), validate=True)
+
+    @pytest.mark.parametrize("data,expected", [
+        pytest.param(b'\xff\xfe\xfd', b'\xff\xfe\xfd', id="invalid-utf8"),
+        pytest.param(b'{"test": "bytes"}', b'{"test": "bytes"}', id="bytes"),
+        pytest.param(_NonSerializable(), None, id="non-serializable"),
+        pytest.param(_LARGE_DATA, _LARGE_DATA, id="too-large"),
+    ])
+    def test_event_data_without_validation(self, mock_event_factory, data, expected):
+        """Test that bytes are kept raw and unserializable data dropped without validation."""
+        row = event_to_row(mock_event_factory(data=data), validate=False)
+        
+        assert row[DATA] == expected
+
+    def test_event_with_missing_attributes(self, mock_event_factory):
         """Test event with missing optional attributes."""
-        mock_event = Mock()
-        mock_event.id = 'test-id'
-        mock_event.type = None
-        mock_event.stream_name = None
-        mock_event.recorded_at = datetime(2023, 1, 1, 12, 0, 0)
-        mock_event.data = 'test data'
-        # Mock the metadata attributes to avoid Mock object issues
-        mock_event.stream_position = 1
-        mock_event.commit_position = 100
-        mock_event.prepare_position = 99
-        mock_event.retry_count = 0
-        mock_event.link = None
-        mock_event.content_type = 'application/json'
-        mock_event.created = datetime(2023, 1, 1, 12, 0, 0)
-        
-        sqlite_event = SQLiteEvent(mock_event)
-        
-        assert sqlite_event.type == 'unknown'
-        assert sqlite_event.stream_name == 'unknown'
-
-    def test_metadata_serialization(self):
-        """Test that metadata is properly serialized to JSON."""
-        mock_event = self.create_mock_event()
-        sqlite_event = SQLiteEvent(mock_event)
-        
-        metadata = json.loads(sqlite_event.eventstore_metadata)
-        assert metadata['stream_position'] == 1
-        assert metadata['commit_position'] == 100
-        assert metadata['prepare_position'] == 99
-        assert metadata['retry_count'] == 0
-        assert metadata['content_type'] == 'application/json'
-
-    def test_metadata_with_none_values(self):
-        """Test that None values are excluded from metadata."""
-        mock_event = self.create_mock_event(
-            stream_position=None,
-            commit_position=None,
-            link=None
-        )
-        sqlite_event = SQLiteEvent(mock_event)
-        
-        metadata = json.loads(sqlite_event.eventstore_metadata)
-        assert 'stream_position' not in metadata
-        assert 'commit_position' not in metadata
-        assert 'link' not in metadata
-
-    def test_metadata_timestamp_conversion(self):
-        """Test that datetime objects in metadata are converted to timestamps."""
-        created_time = datetime(2023, 1, 1, 12, 0, 0)
-        mock_event = self.create_mock_event(created=created_time)
-        sqlite_event = SQLiteEvent(mock_event)
-        
-        metadata = json.loads(sqlite_event.eventstore_metadata)
-        assert metadata['created'] == int(created_time.timestamp())
+        mock_event = mock_event_factory(id='test-id', type=None, stream_name=None, data='test data')
+        
+        row = event_to_row(mock_event)
+        
+        assert row[TYPE] == 'unknown'
+        assert row[STREAM_NAME] == 'unknown'
+
+    @pytest.mark.parametrize("overrides,expected", [
+        pytest.param({}, {
+            'stream_position': 1,
+            'commit_position': 100,
+            'prepare_position': 99,
+            'retry_count': 0,
+            'content_type': 'application/json',
+        }, id="serialized"),
+        pytest.param({'stream_position': None, 'commit_position': None, 'link': None}, {
+            'stream_position': _MISSING,
+            'commit_position': _MISSING,
+            'link': _MISSING,
+        }, id="none-values-excluded"),
+        pytest.param({'created': datetime(2023, 1, 2, 8, 30)},
+                     {'created': int(datetime(2023, 1, 2, 8, 30).timestamp())}, id="timestamp-conversion"),
+    ])
+    def test_metadata(self, mock_event_factory, overrides, expected):
+        """Test that metadata is serialized to JSON, without None values and with Unix timestamps."""
+        row = event_to_row(mock_event_factory(**overrides))
+        
+        metadata = _json_loads(row[METADATA])
+        assert {key: metadata.get(key, _MISSING) for key in expected} == expected
@@ -4,308 +4,353 @@ Tests for SQLiteEventStore class. (Generated using Claude.ai)
 
 import pytest
 import sqlite3
-import tempfile
-from pathlib import Path
-from unittest.mock import Mock, patch, MagicMock
-from datetime import datetime
-from main import SQLiteEventStore, ConversionConfig, SQLiteEvent
+import time
+from dataclasses import replace
+from uuid import UUID
+from unittest.mock import Mock
+from main import SQLiteEventStore, event_to_row
+
+
+# Schema as created by versions storing ids as 36 char TEXT
+_LEGACY_SCHEMA_SQL = """
+    CREATE TABLE events (
+        id TEXT PRIMARY KEY,
+        recorded_at INTEGER NOT NULL,
+        event_type TEXT NOT NULL,
+        stream_name TEXT NOT NULL,
+        data TEXT,
+        eventstore_metadata TEXT,
+        processed_at INTEGER DEFAULT (strftime('%s', 'now')),
+        CHECK (recorded_at > 0),
+        CHECK (length(event_type) > 0),
+        CHECK (length(stream_name) > 0)
+    );
+    CREATE TABLE conversion_metadata (
+        key TEXT PRIMARY KEY,
+        value TEXT NOT NULL,
+        updated_at INTEGER DEFAULT (strftime('%s', 'now'))
+    );
+"""
+
+
+def _apply_test_pragmas(store):
+    """Journal in memory and never fsync: test databases are throwaway."""
+    store.connection.execute("PRAGMA journal_mode=MEMORY")
+    store.connection.execute("PRAGMA synchronous=OFF")
+    store.connection.execute("PRAGMA temp_store=MEMORY")
+
+
+@pytest.fixture(autouse=True)
+def fast_sqlite_pragmas(request, monkeypatch):
+    """Replace the store PRAGMAs, unless the test is marked sqlite_pragmas."""
+    # Only the store unit tests; the integration tests keep the production settings
+    if request.node.get_closest_marker("sqlite_pragmas") is None:
+        monkeypatch.setattr(SQLiteEventStore, "_apply_pragmas", _apply_test_pragmas)
+
+
+@pytest.fixture
+def empty_store(mem_db_path, config):
+    """Private in-memory store, connected outside of any transaction and closed after the test."""
+    # A fresh :memory: database per test is cheap and leaves nothing to reset
+    with SQLiteEventStore(mem_db_path, config) as store:
+        store.connection.commit()
+        yield store
+
+
+def _make_rows(event, count):
+    """Build event rows with unique IDs."""
+    row = event_to_row(event)
+    return [(f'test-event-{i}',) + row[1:] for i in range(count)]
+
+
+@pytest.fixture(scope="module")
+def event_rows(default_mock_event):
+    """Rows with unique IDs built once for the module, tests slice what they need."""
+    # A tuple, since save_events_batch() only reads its rows
+    return tuple(_make_rows(default_mock_event, 16))
+
+
+@pytest.fixture(params=[0, 3, 5], ids=lambda n: f"{n}-events")
+def populated_store(request, empty_store, event_rows):
+    """Fresh store holding one batch of n events, yields (store, n)."""
+    empty_store.save_events_batch(event_rows[:request.param])
+    return empty_store, request.param
 
 
 class TestSQLiteEventStore:
     """Test cases for SQLiteEventStore class."""
 
-    @pytest.fixture
-    def temp_db_path(self):
-        """Create a temporary database path for testing."""
-        with tempfile.NamedTemporaryFile(suffix='.db', delete=False) as f:
-            temp_path = Path(f.name)
-        yield temp_path
-        # Cleanup
-        if temp_path.exists():
-            temp_path.unlink()
-
-    @pytest.fixture
-    def config(self):
-        """Create a test configuration."""
-        return ConversionConfig(
-            eventstore_uri="esdb://localhost:2113",
-            db_path=Path("test.db"),
-            batch_size=100,
-            commit_frequency=2
-        )
-
-    @pytest.fixture
-    def mock_event(self):
-        """Create a mock EventStore event."""
-        event = Mock()
-        event.id = 'test-event-id'
-        event.type = 'TestEvent'
-        event.stream_name = 'test-stream'
-        event.recorded_at = datetime(2023, 1, 1, 12, 0, 0)
-        event.data = '{"test": "data"}'
-        event.stream_position = 1
-        event.commit_position = 100
-        event.prepare_position = 99
-        event.retry_count = 0
-        event.link = None
-        event.content_type = 'application/json'
-        event.created = datetime(2023, 1, 1, 12, 0, 0)
-        return event
-
-    def test_initialization(self, temp_db_path, config):
+    def test_initialization(self, mem_db_path, config):
         """Test SQLiteEventStore initialization."""
-        store = SQLiteEventStore(temp_db_path, config)
+        store = SQLiteEventStore(mem_db_path, config)
         
-        assert store.db_path == temp_db_path
+        assert store.db_path == mem_db_path
         assert store.config == config
         assert store.connection is None
         assert store.events_processed == 0
         assert store.batches_processed == 0
 
-    def test_context_manager(self, temp_db_path, config):
+    def test_context_manager(self, mem_db_path, config):
         """Test SQLiteEventStore as context manager."""
-        with SQLiteEventStore(temp_db_path, config) as store:
+        with SQLiteEventStore(mem_db_path, config) as store:
             assert store.connection is not None
             assert isinstance(store.connection, sqlite3.Connection)
         
         # Connection should be closed after context exit
         assert store.connection is None
 
-    def test_connect_and_schema_creation(self, temp_db_path, config):
+    def test_connect_and_schema_creation(self, empty_store, sqlite_object_exists):
         """Test database connection and schema creation."""
-        store = SQLiteEventStore(temp_db_path, config)
-        store.connect()
+        assert empty_store.connection is not None
         
-        try:
-            assert store.connection is not None
-            
-            # Check if tables were created
-            cursor = store.connection.execute(
-                "SELECT name FROM sqlite_master WHERE type='table'"
-            )
-            table_names = [row[0] for row in cursor.fetchall()]
-            
-            assert 'events' in table_names
-            assert 'conversion_metadata' in table_names
-            
-            # Check events table schema
-            cursor = store.connection.execute("PRAGMA table_info(events)")
-            columns = {row[1] for row in cursor.fetchall()}
-            
-            expected_columns = {
-                'id', 'recorded_at', 'event_type', 'stream_name',
-                'data', 'eventstore_metadata', 'processed_at'
-            }
-            assert expected_columns.issubset(columns)
-            
-        finally:
-            store.close()
-
-    def test_index_creation(self, temp_db_path, config):
-        """Test that indexes are created when enabled."""
-        config.create_indexes = True
-        store = SQLiteEventStore(temp_db_path, config)
-        store.connect()
+        # Check if tables were created
+        assert sqlite_object_exists(empty_store.connection, 'table', 'events')
+        assert sqlite_object_exists(empty_store.connection, 'table', 'conversion_metadata')
         
-        try:
-            # Check if indexes were created
+        # Check events table schema
+        cursor = empty_store.connection.execute("PRAGMA table_info(events)")
+        columns = {row[1] for row in cursor}
+        
+        expected_columns = {
+            'id', 'recorded_at', 'event_type', 'stream_name',
+            'data', 'eventstore_metadata', 'processed_at'
+        }
+        assert expected_columns.issubset(columns)
+
+    def test_index_creation(self, temp_db_path, config, sqlite_object_exists):
+        """Test that indexes are created on close when enabled."""
+        config = replace(config, create_indexes=True)
+        with SQLiteEventStore(temp_db_path, config) as store:
+            # Indexes are deferred until the bulk load is finished
             cursor = store.connection.execute(
-                "SELECT name FROM sqlite_master WHERE type='index'"
+                "SELECT COUNT(*) FROM sqlite_master WHERE type='index' AND name LIKE 'idx_%'"
             )
-            index_names = [row[0] for row in cursor.fetchall()]
-            
-            expected_indexes = [
-                'idx_events_recorded_at',
-                'idx_events_type',
-                'idx_events_stream',
-                'idx_events_processed_at'
-            ]
-            
+            assert cursor.fetchone()[0] == 0
+        
+        expected_indexes = [
+            'idx_events_recorded_at',
+            'idx_events_type',
+            'idx_events_stream',
+            'idx_events_processed_at'
+        ]
+        
+        # Check if indexes were created
+        with sqlite3.connect(temp_db_path) as conn:
             for expected_index in expected_indexes:
-                assert expected_index in index_names
-                
-        finally:
-            store.close()
+                assert sqlite_object_exists(conn, 'index', expected_index)
 
     def test_skip_index_creation(self, temp_db_path, config):
         """Test that indexes are skipped when disabled."""
-        config.create_indexes = False
+        config = replace(config, create_indexes=False)
         store = SQLiteEventStore(temp_db_path, config)
         store.connect()
+        store.close()
         
-        try:
-            # Check that no custom indexes were created
-            cursor = store.connection.execute(
-                "SELECT name FROM sqlite_master WHERE type='index' AND name NOT LIKE 'sqlite_autoindex%'"
+        # Check that no custom indexes were created
+        with sqlite3.connect(temp_db_path) as conn:
+            cursor = conn.execute(
+                "SELECT COUNT(*) FROM sqlite_master WHERE type='index' AND name NOT LIKE 'sqlite_autoindex%'"
             )
-            index_names = [row[0] for row in cursor.fetchall()]
             
             # No custom indexes should exist
-            assert len(index_names) == 0
-            
-        finally:
-            store.close()
+            assert cursor.fetchone()[0] == 0
 
-    def test_save_events_batch(self, temp_db_path, config, mock_event):
-        """Test saving a batch of events."""
-        # Set commit frequency to 1 to ensure immediate commit
-        config.commit_frequency = 1
-        store = SQLiteEventStore(temp_db_path, config)
-        store.connect()
+    @pytest.mark.parametrize("commit_frequency,batch_sizes,in_transaction", [
+        pytest.param(1, [3], [False], id="commit-every-batch"),
+        pytest.param(2, [2, 2, 1], [True, False, True], id="commit-every-2-batches"),
+        pytest.param(1, [0], [False], id="empty-batch"),
+    ])
+    def test_save_events_batches(self, empty_store, config, event_rows,
+                                 commit_frequency, batch_sizes, in_transaction):
+        """Test saving batches of events and committing at the configured frequency."""
+        empty_store.config = replace(config, commit_frequency=commit_frequency)
+        rows = event_rows[:sum(batch_sizes)]
         
-        try:
-            # Create SQLite events with unique IDs
-            sqlite_events = []
-            for i in range(3):
-                event_copy = Mock()
-                event_copy.id = f'test-event-{i}'
-                event_copy.type = mock_event.type
-                event_copy.stream_name = mock_event.stream_name
-                event_copy.recorded_at = mock_event.recorded_at
-                event_copy.data = mock_event.data
-                event_copy.stream_position = mock_event.stream_position
-                event_copy.commit_position = mock_event.commit_position
-                event_copy.prepare_position = mock_event.prepare_position
-                event_copy.retry_count = mock_event.retry_count
-                event_copy.link = mock_event.link
-                event_copy.content_type = mock_event.content_type
-                event_copy.created = mock_event.created
-                sqlite_events.append(SQLiteEvent(event_copy))
-            
-            # Save batch
-            store.save_events_batch(sqlite_events)
-            
-            # Check that events were saved
-            cursor = store.connection.execute("SELECT COUNT(*) FROM events")
-            count = cursor.fetchone()[0]
-            assert count == 3
-            
-            # Check counters
-            assert store.events_processed == 3
-            assert store.batches_processed == 1
-            
-        finally:
-            store.close()
+        start = 0
+        for size, expected in zip(batch_sizes, in_transaction):
+            empty_store.save_events_batch(rows[start:start + size])
+            start += size
+            # A commit ends the transaction opened by the batch inserts
+            assert empty_store.connection.in_transaction is expected
+        
+        count, distinct_times, missing_times = empty_store.connection.execute(
+            "SELECT COUNT(*), COUNT(DISTINCT processed_at), COUNT(*) - COUNT(processed_at) FROM events"
+        ).fetchone()
+        saved_batches = sum(1 for size in batch_sizes if size)
+        assert count == len(rows)
+        # Processing time is set once for each batch
+        assert missing_times == 0
+        assert distinct_times <= saved_batches
+        
+        # Check counters
+        assert empty_store.events_processed == len(rows)
+        assert empty_store.batches_processed == saved_batches
 
-    def test_save_empty_batch(self, temp_db_path, config):
-        """Test saving an empty batch."""
-        store = SQLiteEventStore(temp_db_path, config)
-        store.connect()
+    def test_save_batch_split_into_multi_row_inserts(self, empty_store, config, event_rows):
+        """Test that batches larger than the per-statement row limit are chunked."""
+        # The per-statement row limit never exceeds the batch size
+        empty_store.config = replace(config, batch_size=2)
+        assert empty_store.config.max_rows_per_stmt == 2
         
-        try:
-            initial_count = store.events_processed
-            
-            # Save empty batch
-            store.save_events_batch([])
-            
-            # Counters should not change
-            assert store.events_processed == initial_count
-            assert store.batches_processed == 0
-            
-        finally:
-            store.close()
+        empty_store.save_events_batch(event_rows[:5])
+        
+        cursor = empty_store.connection.execute("SELECT COUNT(*) FROM events")
+        assert cursor.fetchone()[0] == 5
+        assert empty_store.events_processed == 5
+        assert empty_store.batches_processed == 1
 
-    def test_commit_frequency(self, temp_db_path, config, mock_event):
-        """Test that commits happen at the specified frequency."""
-        config.commit_frequency = 2
-        store = SQLiteEventStore(temp_db_path, config)
-        store.connect()
+    def test_only_full_size_insert_statements_cached(self, empty_store, config, event_rows):
+        """Test that the short last chunks of batches do not grow the statement cache."""
+        empty_store.config = replace(config, batch_size=4)
         
+        for size in (5, 6, 7, 4):
+            empty_store.save_events_batch(event_rows[:size])
+        
+        assert list(empty_store._insert_sql_cache) == [4]
+
+    @pytest.mark.perf
+    @pytest.mark.parametrize("n", [1_000, 10_000])
+    def test_large_batch_throughput(self, empty_store, config, default_mock_event, n):
+        """
+        Test that large batches stay on the bulk insert path.
+        
+        save_events_batch() is expected to bind up to max_rows_per_stmt rows per
+        multi-row INSERT and to leave committing to close(), so a large batch
+        costs one statement per chunk and no commit. Single-row batches run in
+        the same open transaction, so per-row throughput must not collapse as
+        the batch grows.
+        """
+        empty_store.config = replace(config, batch_size=n, commit_frequency=0)
+        rows = _make_rows(default_mock_event, n + 21)
+        single_rows, rows = rows[:21], rows[21:]
+        
+        # Baseline: median of single-row batches, the first one warms up the cursor
+        single_ns = []
+        for row in single_rows:
+            start = time.perf_counter_ns()
+            empty_store.save_events_batch([row])
+            single_ns.append(time.perf_counter_ns() - start)
+        single_rate = 1e9 / sorted(single_ns[1:])[len(single_ns) // 2]
+        
+        statements = []
+        empty_store.connection.set_trace_callback(statements.append)
         try:
-            # Create events
-            sqlite_events = [SQLiteEvent(mock_event) for _ in range(5)]
-            
-            # Save first batch (should not commit yet)
-            store.save_events_batch(sqlite_events[:2])
-            assert store.batches_processed == 1
-            
-            # Save second batch (should commit)
-            store.save_events_batch(sqlite_events[2:4])
-            assert store.batches_processed == 2
-            
-            # Save third batch (should not commit yet)
-            store.save_events_batch(sqlite_events[4:])
-            assert store.batches_processed == 3
-            
+            start = time.perf_counter_ns()
+            empty_store.save_events_batch(rows)
+            elapsed_ns = time.perf_counter_ns() - start
         finally:
-            store.close()
+            empty_store.connection.set_trace_callback(None)
+        
+        # One multi-row INSERT per chunk, and no COMMIT
+        rows_per_stmt = empty_store.config.max_rows_per_stmt
+        assert len(statements) == -(-n // rows_per_stmt)
+        assert all('INTO events' in sql for sql in statements)
+        assert n * 1e9 / elapsed_ns >= single_rate / 2
+
+    def test_single_transaction_by_default(self, temp_db_path, config, event_rows):
+        """Test that events are only committed on close when commit frequency is 0."""
+        config = replace(config, commit_frequency=0)
+        with SQLiteEventStore(temp_db_path, config) as store:
+            for row in event_rows[:3]:
+                store.save_events_batch([row])
+            
+            # Nothing is visible to other connections before close
+            with sqlite3.connect(temp_db_path) as conn:
+                count = conn.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+            assert count == 0
+        
+        with sqlite3.connect(temp_db_path) as conn:
+            count = conn.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+        assert count == 3
 
-    def test_update_conversion_metadata(self, temp_db_path, config):
+    def test_update_conversion_metadata(self, empty_store):
         """Test updating conversion metadata."""
-        store = SQLiteEventStore(temp_db_path, config)
-        store.connect()
+        # Update metadata
+        empty_store.update_conversion_metadata('test_key', 'test_value')
         
-        try:
-            # Update metadata
-            store.update_conversion_metadata('test_key', 'test_value')
-            
-            # Check that metadata was saved
-            cursor = store.connection.execute(
-                "SELECT value FROM conversion_metadata WHERE key = ?",
-                ('test_key',)
-            )
-            result = cursor.fetchone()
-            assert result is not None
-            assert result[0] == 'test_value'
-            
-        finally:
-            store.close()
+        # Check that metadata was saved
+        cursor = empty_store.connection.execute(
+            "SELECT value FROM conversion_metadata WHERE key = ?",
+            ('test_key',)
+        )
+        result = cursor.fetchone()
+        assert result is not None
+        assert result[0] == 'test_value'
+
+    def test_get_stats(self, populated_store, default_mock_event):
+        """Test getting conversion statistics (uncommitted rows are visible to the store's connection)."""
+        store, n = populated_store
+        recorded_at = int(default_mock_event.recorded_at.timestamp())
+        
+        stats = store.get_stats()
+        
+        assert stats['total_events'] == n
+        assert stats['events_processed_this_session'] == n
+        # Empty batches are not counted
+        assert stats['batches_processed'] == (1 if n else 0)
+        assert stats['date_range'] == ((recorded_at, recorded_at) if n else (None, None))
 
-    def test_get_stats(self, temp_db_path, config, mock_event):
-        """Test getting conversion statistics."""
-        # Set commit frequency to 1 to ensure immediate commit
-        config.commit_frequency = 1
+    def test_get_stats_resumed_import_counts_existing_rows(self, temp_db_path, config, event_rows):
+        """Test that stats of a resumed import include rows from earlier runs."""
+        with SQLiteEventStore(temp_db_path, config) as store:
+            store.save_events_batch(event_rows[:3])
+        
+        with SQLiteEventStore(temp_db_path, config) as store:
+            store.save_events_batch(event_rows[:1])
+            stats = store.get_stats()
+        
+        assert stats['total_events'] == 3
+        assert stats['events_processed_this_session'] == 1
+
+    def test_fresh_import_keeps_first_duplicate_id(self, empty_store, event_rows):
+        """Test that an id repeated by another stream is skipped instead of failing the import."""
+        duplicate = event_rows[0][:3] + ('other-stream',) + event_rows[0][4:]
+
+        empty_store.save_events_batch([event_rows[0], duplicate])
+        empty_store.save_events_batch([duplicate, event_rows[2]])
+
+        stats = empty_store.get_stats()
+        assert stats['total_events'] == 2
+        assert stats['events_processed_this_session'] == 4
+        stream_name = empty_store.connection.execute(
+            "SELECT stream_name FROM events WHERE id = ?", (event_rows[0][0],)
+        ).fetchone()[0]
+        assert stream_name == event_rows[0][3]
+
+    def test_constraint_violation_not_ignored(self, empty_store, event_rows):
+        """Test that only duplicate ids are skipped, other constraint violations fail."""
+        invalid = ('invalid-event', 0) + event_rows[0][2:]
+
+        with pytest.raises(sqlite3.IntegrityError, match="CHECK constraint failed"):
+            empty_store.save_events_batch([event_rows[0], invalid])
+
+    def test_database_size_set_on_close(self, temp_db_path, config, event_rows):
+        """Test that the database size is measured when the store is closed."""
         store = SQLiteEventStore(temp_db_path, config)
         store.connect()
+        store.save_events_batch(event_rows[:3])
+        assert store.database_size_mb is None
         
-        try:
-            # Add some events with unique IDs
-            sqlite_events = []
-            for i in range(5):
-                event_copy = Mock()
-                event_copy.id = f'test-event-{i}'
-                event_copy.type = mock_event.type
-                event_copy.stream_name = mock_event.stream_name
-                event_copy.recorded_at = mock_event.recorded_at
-                event_copy.data = mock_event.data
-                event_copy.stream_position = mock_event.stream_position
-                event_copy.commit_position = mock_event.commit_position
-                event_copy.prepare_position = mock_event.prepare_position
-                event_copy.retry_count = mock_event.retry_count
-                event_copy.link = mock_event.link
-                event_copy.content_type = mock_event.content_type
-                event_copy.created = mock_event.created
-                sqlite_events.append(SQLiteEvent(event_copy))
-            store.save_events_batch(sqlite_events)
-            
-            # Get stats
-            stats = store.get_stats()
-            
-            assert stats['total_events'] == 5
-            assert stats['events_processed_this_session'] == 5
-            assert stats['batches_processed'] == 1
-            assert 'date_range' in stats
-            assert 'database_size_mb' in stats
-            
-        finally:
-            store.close()
+        store.close()
+        
+        assert store.database_size_mb == temp_db_path.stat().st_size / (1024 * 1024)
 
-    def test_get_stats_without_connection(self, temp_db_path, config):
+    def test_get_stats_without_connection(self, mem_db_path, config):
         """Test getting stats without database connection."""
-        store = SQLiteEventStore(temp_db_path, config)
+        store = SQLiteEventStore(mem_db_path, config)
         
         # Should not raise error, just return empty dict
         stats = store.get_stats()
         assert stats == {}
 
-    def test_close_with_final_commit(self, temp_db_path, config, mock_event):
+    def test_close_with_final_commit(self, temp_db_path, config, event_rows):
         """Test that close performs final commit and updates metadata."""
         store = SQLiteEventStore(temp_db_path, config)
         store.connect()
         
         # Add some events
-        sqlite_events = [SQLiteEvent(mock_event) for _ in range(3)]
-        store.save_events_batch(sqlite_events)
+        rows = event_rows[:3]
+        store.save_events_batch(rows)
         
         # Close store
         store.close()
@@ -316,52 +361,143 @@ class TestSQLiteEventStore:
         
         assert store.connection is None
 
-    def test_connection_error_handling(self, temp_db_path, config):
+    def test_connection_error_handling(self, monkeypatch, mem_db_path, config):
         """Test handling of connection errors."""
-        # Use an invalid path that can't be created
-        invalid_path = Path("/invalid/path/test.db")
-        store = SQLiteEventStore(invalid_path, config)
+        # Fail the open itself instead of relying on the OS to reject a path
+        connect = Mock(side_effect=sqlite3.OperationalError("unable to open database file"))
+        monkeypatch.setattr('main.sqlite3.connect', connect)
+        store = SQLiteEventStore(mem_db_path, config)
         
-        with pytest.raises((sqlite3.Error, OSError)):
+        with pytest.raises(sqlite3.OperationalError, match="unable to open"):
             store.connect()
+        
+        connect.assert_called_once()
+        assert store.connection is None
 
-    def test_sqlite_error_handling(self, temp_db_path, config, mock_event):
+    def test_sqlite_error_handling(self, mem_db_path, config, event_rows):
         """Test handling of SQLite errors during batch save."""
-        store = SQLiteEventStore(temp_db_path, config)
+        store = SQLiteEventStore(mem_db_path, config)
         store.connect()
+        # Force a SQLite error by closing the connection and trying to save
+        store.connection.close()
         
-        try:
-            # Force a SQLite error by closing the connection and trying to save
-            store.connection.close()
-            
-            invalid_event = SQLiteEvent(mock_event)
-            
-            with pytest.raises(sqlite3.Error):
-                store.save_events_batch([invalid_event])
-                
-        finally:
+        with pytest.raises(sqlite3.Error):
+            store.save_events_batch(event_rows[:1])
+        
+        # The final commit fails too, and the store still lets go of the connection
+        with pytest.raises(sqlite3.Error):
             store.close()
+        assert store.connection is None
 
-    def test_pragma_settings(self, temp_db_path, config):
-        """Test that SQLite PRAGMA settings are applied."""
+    def test_close_error_propagates(self, temp_db_path, config, event_rows, caplog):
+        """Test that a failed index build in close() is raised and rolls back the import."""
+        config = replace(config, create_indexes=True)
         store = SQLiteEventStore(temp_db_path, config)
         store.connect()
+        store.save_events_batch(event_rows)
+        # Simulate a full disk: the database cannot grow to hold the indexes
+        page_count = store.connection.execute("PRAGMA page_count").fetchone()[0]
+        store.connection.execute(f"PRAGMA max_page_count = {page_count}")
         
-        try:
-            # Check journal mode
-            cursor = store.connection.execute("PRAGMA journal_mode")
-            journal_mode = cursor.fetchone()[0]
-            assert journal_mode == "wal"
+        with pytest.raises(sqlite3.OperationalError, match="full"):
+            store.close()
+        
+        assert store.connection is None
+        assert "Error closing database" in caplog.text
+        with sqlite3.connect(temp_db_path) as conn:
+            assert conn.execute("SELECT COUNT(*) FROM events").fetchone()[0] == 0
+        conn.close()
+
+    def test_close_error_does_not_mask_import_error(self, temp_db_path, config, event_rows):
+        """Test that a failing close() on the way out keeps the original exception."""
+        config = replace(config, create_indexes=True)
+        with pytest.raises(RuntimeError, match="import failed"):
+            with SQLiteEventStore(temp_db_path, config) as store:
+                store.save_events_batch(event_rows)
+                page_count = store.connection.execute("PRAGMA page_count").fetchone()[0]
+                store.connection.execute(f"PRAGMA max_page_count = {page_count}")
+                raise RuntimeError("import failed")
+
+    @pytest.mark.sqlite_pragmas
+    def test_pragma_settings(self, temp_db_path, config):
+        """Test that SQLite PRAGMA settings are applied."""
+        with SQLiteEventStore(temp_db_path, config) as store:
+            # Read all settings in a single statement
+            journal_mode, synchronous, cache_size, page_size = store.connection.execute(
+                """
+                SELECT (SELECT journal_mode FROM pragma_journal_mode),
+                       (SELECT synchronous FROM pragma_synchronous),
+                       (SELECT cache_size FROM pragma_cache_size),
+                       (SELECT page_size FROM pragma_page_size)
+                """
+            ).fetchone()
             
-            # Check synchronous mode
-            cursor = store.connection.execute("PRAGMA synchronous")
-            synchronous = cursor.fetchone()[0]
+            assert journal_mode == "wal"
             assert synchronous == 1  # NORMAL
+            assert cache_size == -131072  # 128MB
+            assert page_size == 8192
+
+    @pytest.mark.sqlite_pragmas
+    def test_unsafe_fast_import_pragma_settings(self, temp_db_path, config):
+        """Test that unsafe fast import disables journaling until close."""
+        config = replace(config, unsafe_fast_import=True)
+        with SQLiteEventStore(temp_db_path, config) as store:
+            journal_mode, synchronous = store.connection.execute(
+                "SELECT (SELECT journal_mode FROM pragma_journal_mode),"
+                " (SELECT synchronous FROM pragma_synchronous)"
+            ).fetchone()
+            assert journal_mode == "off"
+            assert synchronous == 0  # OFF
+        
+        # WAL is persistent and must have been restored on close
+        with sqlite3.connect(temp_db_path) as conn:
+            cursor = conn.execute("PRAGMA journal_mode")
+            assert cursor.fetchone()[0] == "wal"
+
+    def test_resumed_import_keeps_existing_events(self, temp_db_path, config, event_rows):
+        """Test that re-importing into an existing database keeps the stored rows."""
+        rows = event_rows[:3]
+        with SQLiteEventStore(temp_db_path, config) as store:
+            store.save_events_batch(rows)
+        
+        with SQLiteEventStore(temp_db_path, config) as store:
+            # Same IDs again, from another stream: the first copy is kept like in a fresh import
+            store.save_events_batch([row[:3] + ('other-stream',) + row[4:] for row in rows])
+            stream_names = store.connection.execute("SELECT stream_name FROM events").fetchall()
+            assert stream_names == [(row[3],) for row in rows]
+
+    def test_resume_legacy_text_id_database(self, temp_db_path, config, mock_event_factory):
+        """Test that resuming a database with TEXT ids (older format) matches stored events instead of duplicating."""
+        event_id = UUID('0f8fad5b-d9cb-469f-a165-70867728950e')
+        with sqlite3.connect(temp_db_path) as conn:
+            conn.executescript(_LEGACY_SCHEMA_SQL)
+            conn.execute(
+                "INSERT INTO events (id, recorded_at, event_type, stream_name) VALUES (?, ?, ?, ?)",
+                (str(event_id), 1672574400, 'TestEvent', 'test-stream')
+            )
+        conn.close()
+        
+        with SQLiteEventStore(temp_db_path, config) as store:
+            store.save_events_batch([event_to_row(mock_event_factory(id=event_id))])
+            assert store.get_stats()['total_events'] == 1
+        
+        with sqlite3.connect(temp_db_path) as conn:
+            rows = conn.execute("SELECT typeof(id), id FROM events").fetchall()
+        conn.close()
+        assert rows == [('text', str(event_id))]
+
+    def test_force_clears_existing_events(self, temp_db_path, config, event_rows):
+        """Test that force mode empties the events table before importing."""
+        with SQLiteEventStore(temp_db_path, config) as store:
+            store.save_events_batch(event_rows[:3])
+        
+        config = replace(config, force=True)
+        with SQLiteEventStore(temp_db_path, config) as store:
+            count = store.connection.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+            assert count == 0
             
-            # Check cache size
-            cursor = store.connection.execute("PRAGMA cache_size")
-            cache_size = cursor.fetchone()[0]
-            assert cache_size == 10000
-            
-        finally:
-            store.close()
+            store.save_events_batch(event_rows[:2])
+        
+        with sqlite3.connect(temp_db_path) as conn:
+            count = conn.execute("SELECT COUNT(*) FROM events").fetchone()[0]
+        assert count == 2